@@ -1,8 +1,13 @@
 import tkinter as tk
 from tkinter import ttk
+import os
+import sys
 import requests
 import predict_2 as predict_2
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.weather_client import get_client
+
 class BikeRentalPredictor:
     def __init__(self):
         self.window = tk.Tk()
@@ -40,21 +45,10 @@ class BikeRentalPredictor:
         
     def get_weather(self):
         try:
-            API_KEY = "CWA-940152A9-E5DE-4CA3-BE4F-909FF22CD714"
             location = "彰化縣"
-            url = "https://opendata.cwa.gov.tw/api/v1/rest/datastore/F-D0047-091?Authorization=CWA-940152A9-E5DE-4CA3-BE4F-909FF22CD714&LocationName=%E5%BD%B0%E5%8C%96%E7%B8%A3"
-        
-            response = requests.get(url)
-            '''
-            params = {
-                "Authorization": API_KEY,
-                "locationName": location
-            }
-            response = requests.get(url, params=params, timeout=10, verify=True)
-            '''
-            if response.status_code == 200:
-                data = response.json()
-                weather_data = data['records']['location'][0]['weatherElement']
+            records = get_client().forecast(location)
+            if records.get('location'):
+                weather_data = records['location'][0]['weatherElement']
                 
                 # 解析資料
                 temp = next(item['elementValue'] for item in weather_data if item['elementName'] == 'TEMP')
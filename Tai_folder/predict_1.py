@@ -1,46 +1,36 @@
 # -*- coding: utf-8 -*-
+import os
+import sys
 import pandas as pd
 import numpy as np
-from mlxtend.frequent_patterns import apriori
-from mlxtend.frequent_patterns import association_rules
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from models.apriori import mine_rules
 
 # 讀取數據
 df = pd.read_csv('./../SeoulBikeData.csv')
 
-# 數據預處理
-# 將連續型變量離散化
-def discretize_column(df, column, bins):
-    labels = [f'{i}' for i in range(len(bins)-1)]
-    df[f'{column}_cat'] = pd.cut(df[column], bins=bins, labels=labels)
-    return df
-
-# 對主要特徵進行離散化
-df = discretize_column(df, 'Temperature(C)', bins=[-20, 0, 10, 20, 30, 40])
-df = discretize_column(df, 'Humidity(%)', bins=[0, 20, 40, 60, 80, 100])
-df = discretize_column(df, 'Wind speed (m/s)', bins=[0, 2, 4, 6, 8, 10])
-df = discretize_column(df, 'Rented Bike Count', bins=[0, 500, 1000, 1500, 2000, 3000])
-#print(df)
-
-# 創建 One-Hot 編碼
-columns_to_encode = ['Temperature(C)_cat', 'Humidity(%)_cat', 'Wind speed (m/s)_cat', 'Rented Bike Count_cat']
-df_encoded = pd.get_dummies(df[columns_to_encode])
-#print(df_encoded)
+# 將連續型變量離散化的區間
+BINS = {
+    'Temperature(C)': [-20, 0, 10, 20, 30, 40],
+    'Humidity(%)': [0, 20, 40, 60, 80, 100],
+    'Wind speed (m/s)': [0, 2, 4, 6, 8, 10],
+    'Rented Bike Count': [0, 500, 1000, 1500, 2000, 3000],
+}
 
-# 使用 Apriori 算法找出頻繁項集
-frequent_itemsets = apriori(df_encoded, min_support=0.1, use_colnames=True)
+# 以 bit-packed Apriori 找出頻繁項集並生成關聯規則 (結果依資料雜湊、區間與門檻快取在 .cache/apriori)
+frequent_itemsets, rules = mine_rules(df, BINS, min_support=0.1, min_threshold=0.5)
 #print(frequent_itemsets.head(5))
 
-# 生成關聯規則
-rules = association_rules(frequent_itemsets, metric="confidence", min_threshold=0.5, num_itemsets=len(frequent_itemsets))
+def _category(column, value):
+    edges = BINS[column]
+    return pd.cut([value], bins=edges, labels=[f'{column}_cat_{i}' for i in range(len(edges) - 1)])[0]
 
 def predict_bike_count(temp, humidity, wind_speed):
     # 將輸入值轉換為對應的類別
-    temp_cat = pd.cut([temp], bins=[-20, 0, 10, 20, 30, 40],
-                      labels=['Temperature(C)_cat_0', 'Temperature(C)_cat_1', 'Temperature(C)_cat_2', 'Temperature(C)_cat_3', 'Temperature(C)_cat_4'])[0]
-    humidity_cat = pd.cut([humidity], bins=[0, 20, 40, 60, 80, 100],
-                          labels=['Humidity(%)_cat_0', 'Humidity(%)_cat_1', 'Humidity(%)_cat_2', 'Humidity(%)_cat_3', 'Humidity(%)_cat_4'])[0]
-    wind_cat = pd.cut([wind_speed], bins=[0, 2, 4, 6, 8, 10],
-                      labels=['Wind speed (m/s)_cat_0', 'Wind speed (m/s)_cat_1', 'Wind speed (m/s)_cat_2', 'Wind speed (m/s)_cat_3', 'Wind speed (m/s)_cat_4'])[0]
+    temp_cat = _category('Temperature(C)', temp)
+    humidity_cat = _category('Humidity(%)', humidity)
+    wind_cat = _category('Wind speed (m/s)', wind_speed)
 
     print(f"溫度類別: {temp_cat}" + f"\n濕度類別: {humidity_cat}" + f"\n風速類別: {wind_cat}")
 
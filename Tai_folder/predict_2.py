@@ -1,44 +1,42 @@
 # -*- coding: utf-8 -*-
-import pandas as pd
+import os
+import sys
 import numpy as np
+import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
-from sklearn.preprocessing import OneHotEncoder
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from models import features
+from models.engines import create_engine
+from models.feature_store import load_feature_set
+from models.predictor import Predictor
 
 # Step 1: Load the data
 data_path = './../SeoulBikeData.csv'
-data = pd.read_csv(data_path)
-
-# Display the first few rows of the dataset
-#print(data.head())
 
 # Step 2: Preprocess data
-# Ensure the target and feature columns are appropriately selected and handle missing values if any
-data = data.dropna()
-data['Rented Bike Count'] = data['Rented Bike Count'].astype(float)
-
-# One-hot encode categorical variables
-ohe = OneHotEncoder(sparse=False, drop='first')
-categorical_features = ['Seasons', 'Holiday', 'Functioning Day']
-categorical_encoded = ohe.fit_transform(data[categorical_features])
-categorical_encoded_df = pd.DataFrame(categorical_encoded, columns=ohe.get_feature_names_out(categorical_features))
-
-# Combine numerical and categorical features
-numerical_features = ['Hour', 'Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)', 'Visibility (10m)',
-                      'Dew point temperature(C)', 'Solar Radiation (MJ/m2)', 'Rainfall(mm)', 'Snowfall (cm)']
-X = pd.concat([data[numerical_features], categorical_encoded_df], axis=1)
-y = data['Rented Bike Count']
+# Cleaning, one-hot encoding and the numerical/categorical design matrix come from
+# the feature store (memory-mapped float32, rebuilt only when the CSV changes)
+feature_set = load_feature_set(data_path)
+ohe = feature_set.ohe
+categorical_features = features.CATEGORICAL_FEATURES
+numerical_features = features.NUMERICAL_FEATURES
+X = feature_set.X
+y = feature_set.y
 
 # Step 3: Analyze correlation
-correlation_matrix = data[numerical_features + ['Rented Bike Count']].corr()
+correlation_matrix = pd.DataFrame(
+    np.corrcoef(np.column_stack([X[:, :len(numerical_features)], y]), rowvar=False),
+    index=numerical_features + ['Rented Bike Count'],
+    columns=numerical_features + ['Rented Bike Count'])
 #print("Correlation matrix:\n", correlation_matrix)
 
 # Step 4: Train-test split
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-# Step 5: Train a model
-model = LinearRegression()
+# Step 5: Train a model (engine chosen by BIKE_MODEL_ENGINE, default linear)
+model = create_engine()
 model.fit(X_train, y_train)
 
 # Evaluate the model
@@ -46,6 +44,9 @@ y_pred = model.predict(X_test)
 rmse = np.sqrt(mean_squared_error(y_test, y_pred))
 #print(f"Root Mean Squared Error (RMSE): {rmse}")
 
+# Immutable encoder + model pair, safe to call from several threads
+predictor = Predictor(model, ohe)
+
 # Step 6: Function for prediction
 def predict_rented_bike_count(hour, temperature, humidity, wind_speed, visibility, dew_point_temp,
                               solar_radiation, rainfall, snowfall, season, holiday, functioning_day):
@@ -64,18 +65,9 @@ def predict_rented_bike_count(hour, temperature, humidity, wind_speed, visibilit
         'Holiday': holiday,
         'Functioning Day': functioning_day
     }
-    input_df = pd.DataFrame([input_data])
-
-    # Encode categorical variables
-    categorical_input = ohe.transform(input_df[categorical_features])
-    categorical_input_df = pd.DataFrame(categorical_input, columns=ohe.get_feature_names_out(categorical_features))
-
-    # Combine numerical and categorical features
-    input_combined = pd.concat([input_df[numerical_features], categorical_input_df], axis=1)
 
-    # Predict rented bike count
-    prediction = model.predict(input_combined)
-    return prediction[0]
+    # Encode and predict rented bike count
+    return predictor.predict_one(**input_data)
 
 '''
 # Example usage
@@ -0,0 +1,69 @@
+"""Apriori mining time vs. row count and minimum support.
+
+    python -m benchmarks.bench_apriori --scales 1 2 4 8 --supports 0.2 0.1 0.05 0.02 --bins 10
+    python -m benchmarks.bench_apriori --compare-mlxtend
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.apriori import apriori_bitpacked, transaction_matrix
+from models.features import DATA_PATH
+
+
+def make_bins(df, columns, n_bins):
+    """Equal-width edges covering each column's observed range"""
+    bins = {}
+    for column in columns:
+        low, high = df[column].min(), df[column].max()
+        bins[column] = list(np.linspace(low - 1e-9, high, n_bins + 1))
+    return bins
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="row-count multipliers (rows are bootstrap-sampled)")
+    parser.add_argument('--supports', type=float, nargs='+', default=[0.2, 0.1, 0.05, 0.02])
+    parser.add_argument('--bins', type=int, default=5, help="bins per discretized column")
+    parser.add_argument('--compare-mlxtend', action='store_true',
+                        help="also time mlxtend.apriori on the dense one-hot frame")
+    args = parser.parse_args()
+
+    data = pd.read_csv(DATA_PATH)
+    columns = ['Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)', 'Rented Bike Count']
+    bins = make_bins(data, columns, args.bins)
+    rng = np.random.default_rng(0)
+
+    header = f"{'rows':>8s} {'support':>8s} {'itemsets':>9s} {'bitpacked s':>12s}"
+    if args.compare_mlxtend:
+        from mlxtend.frequent_patterns import apriori
+        header += f" {'mlxtend s':>10s}"
+    print(header)
+
+    for scale in args.scales:
+        sample = data.iloc[rng.integers(0, len(data), len(data) * scale)].reset_index(drop=True)
+        matrix, names = transaction_matrix(sample, bins)
+        for support in args.supports:
+            elapsed, itemsets = timed(apriori_bitpacked, matrix, names, min_support=support)
+            line = f"{len(sample):8d} {support:8.3f} {len(itemsets):9d} {elapsed:12.4f}"
+            if args.compare_mlxtend:
+                dense = pd.DataFrame(matrix, columns=names)
+                mlxtend_elapsed, _ = timed(apriori, dense, min_support=support, use_colnames=True)
+                line += f" {mlxtend_elapsed:10.4f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
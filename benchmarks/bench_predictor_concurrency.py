@@ -0,0 +1,85 @@
+"""Prediction throughput from 1 to N threads, compared with a process pool.
+
+    python -m benchmarks.bench_predictor_concurrency --engine random_forest --max-workers 8 --batch 64
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import features
+from models.predictor import Predictor
+from models.training import train_model
+
+_process_predictor = None
+
+
+def _init_process(predictor):
+    global _process_predictor
+    _process_predictor = predictor
+
+
+def _process_task(args):
+    records, repeats = args
+    for _ in range(repeats):
+        _process_predictor.predict_batch(records)
+    return len(records) * repeats
+
+
+def _thread_task(predictor, records, repeats):
+    for _ in range(repeats):
+        predictor.predict_batch(records)
+    return len(records) * repeats
+
+
+def run(pool_class, workers, predictor, records, tasks, repeats):
+    if pool_class is ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(workers, initializer=_init_process, initargs=(predictor,))
+        submit = lambda: pool.submit(_process_task, (records, repeats))
+        # Start every worker before timing
+        list(pool.map(_process_task, [(records[:1], 1)] * workers))
+    else:
+        pool = ThreadPoolExecutor(workers)
+        submit = lambda: pool.submit(_thread_task, predictor, records, repeats)
+    with pool:
+        start = time.perf_counter()
+        rows = sum(f.result() for f in [submit() for _ in range(tasks)])
+        elapsed = time.perf_counter() - start
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engine', default='linear')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--batch', type=int, default=1, help="rows per predict call")
+    parser.add_argument('--tasks', type=int, default=64)
+    parser.add_argument('--repeats', type=int, default=50, help="predict calls per task")
+    parser.add_argument('--no-processes', action='store_true')
+    args = parser.parse_args()
+
+    model, ohe = train_model(engine=args.engine)
+    if hasattr(model.estimator, 'n_jobs'):
+        # One thread per predict call so the pools measure the scaling
+        model.estimator.set_params(n_jobs=1)
+    predictor = Predictor(model, ohe)
+    data = features.load_data()
+    records = data.sample(args.batch, random_state=0)[features.NUMERICAL_FEATURES
+                                                      + features.CATEGORICAL_FEATURES].to_dict('records')
+
+    worker_counts = sorted({1, 2, 4, 8, 16, 32, args.max_workers} & set(range(1, args.max_workers + 1)))
+    print(f"engine={args.engine} batch={args.batch} tasks={args.tasks} repeats={args.repeats}")
+    print(f"{'workers':>8s} {'threads rows/s':>15s} {'processes rows/s':>17s}")
+    for workers in worker_counts:
+        threads = run(ThreadPoolExecutor, workers, predictor, records, args.tasks, args.repeats)
+        line = f"{workers:8d} {threads:15.0f}"
+        if not args.no_processes:
+            processes = run(ProcessPoolExecutor, workers, predictor, records, args.tasks, args.repeats)
+            line += f" {processes:17.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Throughput of fetch -> aggregate -> predict against the local replay server.
+
+    python -m benchmarks.bench_weather_pipeline --requests 200 --concurrency 8 --scale 10 --latency 0.05
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import features
+from models.training import train_model
+from utils import metrics
+from utils.weather_client import WeatherClient, county_average
+from utils.weather_fixtures import FIXTURE_DIR, ReplayServer
+
+DEFAULT_INPUT = {
+    'Hour': 12, 'Visibility (10m)': 2000, 'Dew point temperature(C)': 5.0,
+    'Solar Radiation (MJ/m2)': 0.5, 'Rainfall(mm)': 0, 'Snowfall (cm)': 0,
+    'Seasons': 'Winter', 'Holiday': 'No Holiday', 'Functioning Day': 'Yes',
+}
+
+
+def pipeline(client, model, ohe, county):
+    stations = client.observations()
+    with metrics.timer('station_aggregate'):
+        averages = county_average(stations, county)
+    if averages is None:
+        return None
+    temperature, humidity, wind_speed = averages
+    row = dict(DEFAULT_INPUT, **{'Temperature(C)': temperature, 'Humidity(%)': humidity,
+                                 'Wind speed (m/s)': wind_speed})
+    with metrics.timer('predict'):
+        return model.predict(features.encode(features.input_frame(row), ohe))[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--county', default='彰化縣')
+    parser.add_argument('--fixtures', default=FIXTURE_DIR)
+    parser.add_argument('--metrics-out', default=None, help="write stage histograms (.json / .prom)")
+    args = parser.parse_args()
+
+    metrics.enable()
+    model, ohe = train_model()
+
+    with ReplayServer(args.fixtures, latency=args.latency, error_rate=args.error_rate,
+                      scale=args.scale) as server:
+        client = WeatherClient(api_key='replay', base_url=server.base_url, backoff_base=0.01,
+                               backoff_max=0.1, pool_size=args.concurrency)
+
+        latencies = []
+        failures = 0
+
+        def one_request(_):
+            start = time.perf_counter()
+            try:
+                pipeline(client, model, ohe, args.county)
+                return time.perf_counter() - start
+            except Exception:
+                return None
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for elapsed in pool.map(one_request, range(args.requests)):
+                if elapsed is None:
+                    failures += 1
+                else:
+                    latencies.append(elapsed)
+        wall = time.perf_counter() - start
+
+    latencies = np.array(latencies)
+    print(f"requests={args.requests} concurrency={args.concurrency} scale={args.scale} "
+          f"latency={args.latency}s error_rate={args.error_rate}")
+    print(f"throughput: {args.requests / wall:.1f} req/s, failures: {failures}")
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        print(f"end-to-end ms: p50={p50:.2f} p95={p95:.2f} p99={p99:.2f}")
+    for name, snap in metrics.registry.to_dict()['histograms'].items():
+        print(f"  {name:20s} n={snap['count']:6d} mean={snap['mean'] * 1000:.3f} ms")
+    if args.metrics_out:
+        metrics.export(args.metrics_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 import tkinter as tk
 from tkinter import ttk
 import requests
-import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error
-from sklearn.preprocessing import OneHotEncoder
 import joblib
 import math
+import os
 from datetime import datetime
+from utils import metrics
+from utils.weather_client import get_client, county_average
+from models.training import train_model
+from models.station_predict import predict_stations
+from models.hot_swap import ModelWatcher
+from models.predictor import Predictor
+from models.prediction_surface import SurfaceCache
 
 class BikeRentalPredictor:
     def __init__(self):
@@ -44,10 +48,21 @@ class BikeRentalPredictor:
         self.right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=20, pady=20)
         
         # Initialize model and encoder
-        self.model = None
-        self.ohe = None
+        self.predictor = None
+        self.model_watcher = None
         self.load_and_train_model()
         
+        # BIKE_MODEL_DIR: hot-swap newer artifacts published into this directory
+        model_dir = os.environ.get('BIKE_MODEL_DIR')
+        if model_dir:
+            self.model_watcher = ModelWatcher(model_dir, initial=self.predictor)
+            self.model_watcher.poll()
+            self.model_watcher.start()
+        
+        # BIKE_PREDICTION_SURFACE=1: answer what-if queries from a precomputed grid
+        use_surface = os.environ.get('BIKE_PREDICTION_SURFACE', '') not in ('', '0')
+        self.surface_cache = SurfaceCache() if use_surface else None
+        
         # Create UI sections
         self.create_clock_section()
         self.create_weather_section()
@@ -139,8 +154,9 @@ class BikeRentalPredictor:
         self.small_font = (self.base_font_family, max(10, new_size - 1))
         
         # Update styles and widgets
-        self.update_widget_styles()
-        self.update_widget_fonts(self.window)
+        with metrics.timer('ui_redraw'):
+            self.update_widget_styles()
+            self.update_widget_fonts(self.window)
 
     def update_widget_fonts(self, widget):
         """Recursively update fonts for all widgets"""
@@ -172,32 +188,9 @@ class BikeRentalPredictor:
 
     def load_and_train_model(self):
         try:
-            # Load data
-            data_path = './SeoulBikeData.csv'
-            data = pd.read_csv(data_path)
-            data = data.dropna()
-            data['Rented Bike Count'] = data['Rented Bike Count'].astype(float)
-
-            # One-hot encode categorical variables
-            self.ohe = OneHotEncoder(sparse=False, drop='first')  # Changed from sparse_output to sparse
-            categorical_features = ['Seasons', 'Holiday', 'Functioning Day']
-            categorical_encoded = self.ohe.fit_transform(data[categorical_features])
-            categorical_encoded_df = pd.DataFrame(
-                categorical_encoded, 
-                columns=self.ohe.get_feature_names_out(categorical_features)
-            )
-
-            # Prepare features
-            numerical_features = ['Hour', 'Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)', 
-                                'Visibility (10m)', 'Dew point temperature(C)', 
-                                'Solar Radiation (MJ/m2)', 'Rainfall(mm)', 'Snowfall (cm)']
-            X = pd.concat([data[numerical_features], categorical_encoded_df], axis=1)
-            y = data['Rented Bike Count']
-
-            # Split and train
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            self.model = LinearRegression()
-            self.model.fit(X_train, y_train)
+            # Load data, encode and train (engine chosen by BIKE_MODEL_ENGINE)
+            model, ohe = train_model('./SeoulBikeData.csv')
+            self.predictor = Predictor(model, ohe)
             
         except Exception as e:
             print(f"Error loading/training model: {e}")
@@ -255,6 +248,16 @@ class BikeRentalPredictor:
         )
         self.weather_check.pack(side=tk.LEFT, padx=5)
         
+        # Score every station individually instead of the 彰化縣 average
+        self.per_station = tk.BooleanVar(value=False)
+        self.station_check = ttk.Checkbutton(
+            update_controls,
+            text="Per-station prediction",
+            variable=self.per_station
+        )
+        self.station_check.pack(side=tk.LEFT, padx=5)
+        self.station_table = None
+        
         interval_frame = ttk.Frame(weather_frame)
         interval_frame.pack(fill=tk.X, pady=5)
         
@@ -361,6 +364,7 @@ class BikeRentalPredictor:
         self.result_label = ttk.Label(control_frame, text="", wraplength=400)
         self.result_label.pack(pady=10)
 
+    @metrics.timed('ui_clock_redraw')
     def draw_clock(self):
         # Clear canvas
         self.clock_canvas.delete("all")
@@ -445,39 +449,14 @@ class BikeRentalPredictor:
 
     def get_weather(self):
         try:
-            API_KEY = "CWA-15F1DACE-AFC5-444F-B7D7-5CFBC6218CEF"
-            url = 'https://opendata.cwa.gov.tw/api/v1/rest/datastore/O-A0003-001?Authorization=' + API_KEY
-
-            response = requests.get(url)
-            data_json = response.json()
-            weather_data = data_json['records']
-
-            # Initialize variables for calculating averages
-            total_temp = 0
-            total_humidity = 0
-            total_wind_speed = 0
-            station_count = 0
-
-            # Iterate through stations to find 彰化縣 data and accumulate values
-            for station in weather_data['Station']:
-                if station['GeoInfo']['CountyName'] == "彰化縣":
-                    station_count += 1
-
-                    # Extract weather elements
-                    wind_speed = float(station['WeatherElement']['WindSpeed'])
-                    temperature = float(station['WeatherElement']['AirTemperature'])
-                    humidity = float(station['WeatherElement']['RelativeHumidity'])
-
-                    # Accumulate values
-                    total_temp += temperature
-                    total_humidity += humidity
-                    total_wind_speed += wind_speed
-
-            if station_count > 0:
-                # Calculate averages
-                avg_temp = total_temp / station_count
-                avg_humidity = total_humidity / station_count
-                avg_wind_speed = total_wind_speed / station_count
+            stations = get_client().observations()
+
+            # Average the 彰化縣 stations
+            with metrics.timer('station_aggregate'):
+                averages = county_average(stations, "彰化縣")
+
+            if averages is not None:
+                avg_temp, avg_humidity, avg_wind_speed = averages
 
                 # Update input fields
                 self.temp_entry.delete(0, tk.END)
@@ -493,6 +472,9 @@ class BikeRentalPredictor:
             else:
                 self.result_label.config(text="No data found for 彰化縣")
 
+            if self.per_station.get():
+                self.predict_stations(stations)
+
             # Update time if auto-update is enabled
             if self.auto_update_time.get():
                 self.get_current_time()
@@ -505,40 +487,67 @@ class BikeRentalPredictor:
             print(e)
             self.result_label.config(text="Error occurred, please try again later")
     
+    def current_predictor(self):
+        """Predictor snapshot for one prediction; follows hot-swapped artifacts"""
+        if self.model_watcher is not None:
+            return self.model_watcher.current().predictor
+        return self.predictor
+
+    def collect_inputs(self, include_weather=True):
+        """Read the input fields (raises ValueError on invalid numbers)"""
+        input_data = {
+            'Hour': float(self.hour_var.get()),
+            'Visibility (10m)': float(self.visibility_entry.get()),
+            'Dew point temperature(C)': float(self.dewpoint_entry.get()),
+            'Solar Radiation (MJ/m2)': float(self.radiation_entry.get()),
+            'Rainfall(mm)': float(self.rainfall_entry.get()),
+            'Snowfall (cm)': float(self.snowfall_entry.get()),
+            'Seasons': self.season_var.get(),
+            'Holiday': self.holiday_var.get(),
+            'Functioning Day': self.functioning_var.get()
+        }
+        if include_weather:
+            input_data['Temperature(C)'] = float(self.temp_entry.get())
+            input_data['Humidity(%)'] = float(self.humidity_entry.get())
+            input_data['Wind speed (m/s)'] = float(self.windspeed_entry.get())
+        return input_data
+
+    def predict_stations(self, stations):
+        """Score all stations in one batch and show the per-county summary"""
+        try:
+            defaults = self.collect_inputs(include_weather=False)
+            predictor = self.current_predictor()
+            self.station_table = predict_stations(stations, predictor.model, predictor.ohe, defaults)
+            summary = self.station_table.group_summary()
+            lines = [f"{county}: {row['mean']:.0f} bikes avg ({int(row['stations'])} stations)"
+                     for county, row in summary.head(8).iterrows()]
+            self.result_label.config(
+                text=f"Scored {int(self.station_table.valid.sum())} stations\n" + "\n".join(lines))
+        except ValueError:
+            self.result_label.config(text="Per-station prediction needs valid values for the other inputs")
+
     def predict(self):
         try:
             # Get all input values (modified to use hour_var instead of hour_entry)
-            input_data = {
-                'Hour': float(self.hour_var.get()),
-                'Temperature(C)': float(self.temp_entry.get()),
-                'Humidity(%)': float(self.humidity_entry.get()),
-                'Wind speed (m/s)': float(self.windspeed_entry.get()),
-                'Visibility (10m)': float(self.visibility_entry.get()),
-                'Dew point temperature(C)': float(self.dewpoint_entry.get()),
-                'Solar Radiation (MJ/m2)': float(self.radiation_entry.get()),
-                'Rainfall(mm)': float(self.rainfall_entry.get()),
-                'Snowfall (cm)': float(self.snowfall_entry.get()),
-                'Seasons': self.season_var.get(),
-                'Holiday': self.holiday_var.get(),
-                'Functioning Day': self.functioning_var.get()
-            }
+            input_data = self.collect_inputs()
+            predictor = self.current_predictor()
+
+            surface = self.surface_cache.get(predictor, input_data) if self.surface_cache else None
+            if surface is not None:
+                with metrics.timer('predict_surface'):
+                    prediction = surface.lookup(input_data)
+                predicted_count = max(0, int(prediction))
+                self.result_label.config(
+                    text=f"Predicted Rental Count: {predicted_count} bikes "
+                         f"(grid, max error {surface.error['max_abs']:.0f})")
+                return
 
             # Prepare input for prediction
-            input_df = pd.DataFrame([input_data])
-            categorical_features = ['Seasons', 'Holiday', 'Functioning Day']
-            categorical_input = self.ohe.transform(input_df[categorical_features])
-            categorical_input_df = pd.DataFrame(
-                categorical_input, 
-                columns=self.ohe.get_feature_names_out(categorical_features)
-            )
-
-            numerical_features = ['Hour', 'Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)', 
-                                'Visibility (10m)', 'Dew point temperature(C)', 
-                                'Solar Radiation (MJ/m2)', 'Rainfall(mm)', 'Snowfall (cm)']
-            input_combined = pd.concat([input_df[numerical_features], categorical_input_df], axis=1)
+            input_combined = predictor.encode(input_data)
 
             # Make prediction
-            prediction = self.model.predict(input_combined)
+            with metrics.timer('predict'):
+                prediction = predictor.predict_batch(input_combined)
             predicted_count = max(0, int(prediction[0]))
             
             self.result_label.config(text=f"Predicted Rental Count: {predicted_count} bikes")
@@ -560,5 +569,20 @@ class BikeRentalPredictor:
         self.window.mainloop()
 
 if __name__ == "__main__":
-    app = BikeRentalPredictor()
-    app.run()
+    # BIKE_METRICS=1 enables stage timings, BIKE_METRICS_FILE=metrics.json|metrics.prom
+    # dumps them on exit, BIKE_PROFILE=run.prof captures a cProfile of the whole session
+    profile_path = os.environ.get('BIKE_PROFILE')
+    if profile_path:
+        metrics.start_profiling()
+    app = None
+    try:
+        app = BikeRentalPredictor()
+        app.run()
+    finally:
+        if app is not None and app.model_watcher is not None:
+            app.model_watcher.stop()
+        if profile_path:
+            metrics.stop_profiling(profile_path)
+        metrics_path = os.environ.get('BIKE_METRICS_FILE')
+        if metrics_path and metrics.is_enabled():
+            metrics.export(metrics_path)
@@ -0,0 +1,131 @@
+"""Bit-packed Apriori mining with an on-disk cache.
+
+Each one-hot item is stored as a packed bit column (one bit per row), so the
+support of a candidate itemset is an AND of bit rows plus a popcount instead
+of a scan over a dense boolean frame. The output matches mlxtend's
+`apriori(..., use_colnames=True)` so `association_rules` works unchanged.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import association_rules
+
+from models.features import ROOT_DIR
+
+CACHE_DIR = os.path.join(ROOT_DIR, '.cache', 'apriori')
+CACHE_VERSION = 1
+
+# Number of set bits in every byte value
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.int64)
+
+
+def transaction_matrix(df, bins):
+    """Discretize `bins` = {column: edges} into a boolean (rows, items) matrix.
+
+    Item names follow pd.get_dummies on the `<column>_cat` columns, e.g.
+    'Temperature(C)_cat_0'. Values outside the edges set no item.
+    """
+    blocks = []
+    names = []
+    for column, edges in bins.items():
+        codes = pd.cut(df[column], bins=edges, labels=False).to_numpy()
+        n_bins = len(edges) - 1
+        block = np.zeros((len(df), n_bins), dtype=bool)
+        valid = ~np.isnan(codes)
+        block[np.nonzero(valid)[0], codes[valid].astype(np.int64)] = True
+        blocks.append(block)
+        names.extend(f"{column}_cat_{i}" for i in range(n_bins))
+    return np.hstack(blocks), names
+
+
+def pack_items(matrix):
+    """(rows, items) bool -> (items, ceil(rows / 8)) uint8 bit rows"""
+    return np.packbits(np.ascontiguousarray(matrix.T), axis=1)
+
+
+def _support(bits, n_rows):
+    return _POPCOUNT[bits].sum(axis=-1) / n_rows
+
+
+def apriori_bitpacked(matrix, columns, min_support=0.5, max_len=None):
+    """Frequent itemsets of a boolean matrix, same format as mlxtend.apriori"""
+    n_rows = matrix.shape[0]
+    item_bits = pack_items(matrix)
+    item_support = _support(item_bits, n_rows)
+
+    frequent = [i for i in range(len(columns)) if item_support[i] >= min_support]
+    supports = [item_support[i] for i in frequent]
+    itemsets = [(i,) for i in frequent]
+    # Bit rows of the current level's itemsets, indexed like `level`
+    level = [(i,) for i in frequent]
+    level_bits = item_bits[frequent]
+    frequent_set = set(level)
+
+    k = 1
+    while level and (max_len is None or k < max_len):
+        # Join itemsets sharing their first k-1 items, prune by the Apriori property
+        prefix_index = {}
+        for idx, itemset in enumerate(level):
+            prefix_index.setdefault(itemset[:-1], []).append(idx)
+        parents = []
+        extensions = []
+        candidates = []
+        for members in prefix_index.values():
+            for a_pos, a in enumerate(members):
+                for b in members[a_pos + 1:]:
+                    candidate = level[a] + (level[b][-1],)
+                    if all(candidate[:j] + candidate[j + 1:] in frequent_set for j in range(k - 1)):
+                        parents.append(a)
+                        extensions.append(level[b][-1])
+                        candidates.append(candidate)
+        if not candidates:
+            break
+
+        candidate_bits = np.bitwise_and(level_bits[parents], item_bits[extensions])
+        candidate_support = _support(candidate_bits, n_rows)
+        keep = np.nonzero(candidate_support >= min_support)[0]
+
+        level = [candidates[i] for i in keep]
+        level_bits = candidate_bits[keep]
+        frequent_set = set(level)
+        itemsets.extend(level)
+        supports.extend(candidate_support[keep])
+        k += 1
+
+    return pd.DataFrame({
+        'support': np.asarray(supports, dtype=float),
+        'itemsets': [frozenset(columns[i] for i in itemset) for itemset in itemsets],
+    })
+
+
+def cache_key(df, bins, min_support, min_threshold):
+    """Hash of the binned source columns, bin edges and mining thresholds"""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df[list(bins)], index=False).values.tobytes())
+    digest.update(json.dumps({'bins': {c: list(map(float, e)) for c, e in bins.items()},
+                              'min_support': min_support, 'min_threshold': min_threshold,
+                              'version': CACHE_VERSION}, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+def mine_rules(df, bins, min_support=0.1, min_threshold=0.5, metric='confidence', cache_dir=CACHE_DIR):
+    """(frequent_itemsets, rules), reusing a cached result when the inputs match"""
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, f"{cache_key(df, bins, min_support, min_threshold)}_{metric}.pkl")
+        if os.path.exists(path):
+            cached = pd.read_pickle(path)
+            return cached['frequent_itemsets'], cached['rules']
+
+    matrix, columns = transaction_matrix(df, bins)
+    frequent_itemsets = apriori_bitpacked(matrix, columns, min_support=min_support)
+    rules = association_rules(frequent_itemsets, metric=metric, min_threshold=min_threshold,
+                              num_itemsets=len(frequent_itemsets))
+
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        pd.to_pickle({'frequent_itemsets': frequent_itemsets, 'rules': rules}, path)
+    return frequent_itemsets, rules
@@ -2,12 +2,12 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor
 import joblib
+from models.engines import create_engine, from_artifact, from_estimator
 
 class BikeRentalModel:
-    def __init__(self):
-        self.model = RandomForestRegressor()
+    def __init__(self, engine='random_forest', **engine_params):
+        self.model = create_engine(engine, **engine_params)
         self.scaler = StandardScaler()
         
     def preprocess_data(self, data):
@@ -53,7 +53,14 @@ class BikeRentalModel:
         return predictions
         
     def save_model(self, model_path='model.joblib'):
-        joblib.dump((self.model, self.scaler), model_path)
+        self.model.save(model_path, scaler=self.scaler)
         
     def load_model(self, model_path='model.joblib'):
-        self.model, self.scaler = joblib.load(model_path)
+        artifact = joblib.load(model_path)
+        if isinstance(artifact, tuple):
+            # Artifacts saved before the engine registry: (estimator, scaler)
+            estimator, self.scaler = artifact
+            self.model = from_estimator(estimator)
+        else:
+            self.model = from_artifact(artifact)
+            self.scaler = self.model.metadata['scaler']
@@ -0,0 +1,196 @@
+"""Model engines behind one fit / predict / save / load interface.
+
+    python -m models.engines                 # compare every registered engine
+    python -m models.engines --engine hist_gradient_boosting --save model.joblib
+"""
+import argparse
+import io
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+try:
+    from sklearn.ensemble import HistGradientBoostingRegressor
+except ImportError:  # scikit-learn < 1.0
+    from sklearn.experimental import enable_hist_gradient_boosting  # noqa: F401
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+from models.streaming import StandardizedSGDRegressor, StreamingLinearRegression
+
+DEFAULT_ENGINE = os.environ.get('BIKE_MODEL_ENGINE', 'linear')
+
+ENGINES = {}
+
+
+def register_engine(name):
+    """Class decorator adding an engine to the registry under `name`"""
+    def decorator(cls):
+        cls.name = name
+        ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+class ModelEngine:
+    """Wraps one scikit-learn regressor and records its cost"""
+
+    name = None
+    estimator_class = None
+    default_params = {}
+
+    def __init__(self, **params):
+        self.params = dict(self.default_params, **params)
+        self.estimator = self.estimator_class(**self.params)
+        self.metadata = {}
+        self.training_time = None
+        self.inference_latency = None
+        self.batch_latency = None
+        self._artifact_size = None
+
+    def fit(self, X, y):
+        start = time.perf_counter()
+        self.estimator.fit(X, y)
+        self.training_time = time.perf_counter() - start
+        self._artifact_size = None
+        return self
+
+    def predict(self, X):
+        return self.estimator.predict(X)
+
+    def measure_inference(self, X, repeats=20):
+        """Median single-row latency and per-row latency of a full batch (seconds)"""
+        X = np.asarray(X)
+        single = []
+        for i in range(repeats):
+            row = X[i % len(X):i % len(X) + 1]
+            start = time.perf_counter()
+            self.estimator.predict(row)
+            single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        self.estimator.predict(X)
+        self.inference_latency = float(np.median(single))
+        self.batch_latency = (time.perf_counter() - start) / len(X)
+        return self.inference_latency
+
+    @property
+    def artifact_size(self):
+        """Size in bytes of the saved artifact"""
+        if self._artifact_size is None:
+            buffer = io.BytesIO()
+            joblib.dump(self._artifact(), buffer)
+            self._artifact_size = buffer.tell()
+        return self._artifact_size
+
+    def _artifact(self):
+        return {'engine': self.name, 'params': self.params, 'estimator': self.estimator,
+                'metadata': self.metadata, 'training_time': self.training_time}
+
+    def save(self, path, **metadata):
+        """Write the estimator plus `metadata` (e.g. the encoder) to `path`"""
+        self.metadata.update(metadata)
+        joblib.dump(self._artifact(), path)
+        self._artifact_size = os.path.getsize(path)
+        return path
+
+    def report(self):
+        return {'engine': self.name,
+                'training_time': self.training_time,
+                'inference_latency': self.inference_latency,
+                'batch_latency': self.batch_latency,
+                'artifact_size': self.artifact_size}
+
+
+@register_engine('linear')
+class LinearEngine(ModelEngine):
+    estimator_class = LinearRegression
+
+
+@register_engine('random_forest')
+class RandomForestEngine(ModelEngine):
+    estimator_class = RandomForestRegressor
+    default_params = {'n_estimators': 100, 'n_jobs': -1, 'random_state': 42}
+
+
+@register_engine('hist_gradient_boosting')
+class HistGradientBoostingEngine(ModelEngine):
+    estimator_class = HistGradientBoostingRegressor
+    default_params = {'max_iter': 500, 'learning_rate': 0.1, 'early_stopping': True,
+                      'validation_fraction': 0.1, 'n_iter_no_change': 10, 'random_state': 42}
+
+
+@register_engine('streaming_linear')
+class StreamingLinearEngine(ModelEngine):
+    estimator_class = StreamingLinearRegression
+
+
+@register_engine('sgd')
+class SGDEngine(ModelEngine):
+    estimator_class = StandardizedSGDRegressor
+
+
+def create_engine(name=None, **params):
+    name = name or DEFAULT_ENGINE
+    try:
+        return ENGINES[name](**params)
+    except KeyError:
+        raise ValueError(f"Unknown model engine '{name}', choose from {sorted(ENGINES)}") from None
+
+
+def from_estimator(estimator):
+    """Wrap an already fitted estimator in its matching engine"""
+    for cls in ENGINES.values():
+        if type(estimator) is cls.estimator_class:
+            engine = cls()
+            engine.estimator = estimator
+            engine.params = estimator.get_params()
+            return engine
+    raise ValueError(f"No engine registered for {type(estimator).__name__}")
+
+
+def from_artifact(artifact):
+    engine = create_engine(artifact['engine'], **artifact['params'])
+    engine.estimator = artifact['estimator']
+    engine.metadata = artifact.get('metadata', {})
+    engine.training_time = artifact.get('training_time')
+    return engine
+
+
+def load_engine(path):
+    engine = from_artifact(joblib.load(path))
+    engine._artifact_size = os.path.getsize(path)
+    return engine
+
+
+def main():
+    from models.hot_swap import publish_artifact
+    from models.training import train_model
+
+    parser = argparse.ArgumentParser(description="Train and compare model engines")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default=None,
+                        help="train only this engine (default: all)")
+    parser.add_argument('--save', default=None, help="artifact path (with --engine)")
+    parser.add_argument('--publish', default=None,
+                        help="artifact directory watched by running apps (with --engine)")
+    args = parser.parse_args()
+
+    names = [args.engine] if args.engine else sorted(ENGINES)
+    print(f"{'engine':24s} {'train s':>9s} {'1-row ms':>9s} {'batch us/row':>13s} {'size KB':>9s} {'RMSE':>8s}")
+    for name in names:
+        engine, ohe = train_model(engine=name)
+        report = engine.report()
+        print(f"{name:24s} {report['training_time']:9.3f} {report['inference_latency'] * 1e3:9.3f} "
+              f"{report['batch_latency'] * 1e6:13.2f} {report['artifact_size'] / 1024:9.1f} "
+              f"{engine.metadata['test_rmse']:8.1f}")
+        if args.save and args.engine:
+            engine.save(args.save, ohe=ohe)
+            print(f"Saved {args.save}")
+        if args.publish and args.engine:
+            print(f"Published {publish_artifact(engine, ohe, args.publish)}")
+
+
+if __name__ == "__main__":
+    main()
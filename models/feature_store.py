@@ -0,0 +1,139 @@
+"""On-disk cache of the encoded design matrix.
+
+The float32, C-contiguous X and y are stored as .npy files next to the
+column names and the fitted encoder, keyed by a hash of the source CSV and
+of the feature specification. Later runs memory-map them instead of
+re-reading and re-encoding the CSV.
+
+    python -m models.feature_store            # build (or reuse) the cache for SeoulBikeData.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import joblib
+import numpy as np
+
+from models import features, rolling_features
+from utils import metrics
+
+STORE_DIR = os.path.join(features.ROOT_DIR, '.cache', 'feature_store')
+STORE_VERSION = 1
+
+
+def feature_spec(dtype='float32', lag_features=False):
+    """Everything that changes the encoded matrix besides the source data"""
+    return {'numerical': features.NUMERICAL_FEATURES,
+            'categorical': features.CATEGORICAL_FEATURES,
+            'categories': features.CATEGORIES,
+            'drop': 'first',
+            'target': features.TARGET,
+            'lag_features': list(rolling_features.FEATURE_NAMES) if lag_features else [],
+            'dtype': dtype,
+            'version': STORE_VERSION}
+
+
+def source_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def store_key(path, spec):
+    spec_digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"{source_hash(path)[:16]}-{spec_digest[:12]}"
+
+
+class FeatureSet:
+    """Encoded X / y (memory-mapped when loaded from the store) plus encoder state"""
+
+    def __init__(self, X, y, columns, ohe, key, path):
+        self.X = X
+        self.y = y
+        self.columns = columns
+        self.ohe = ohe
+        self.key = key
+        self.path = path
+
+    def __len__(self):
+        return len(self.y)
+
+
+def build(data_path, directory, spec):
+    """Encode `data_path` into `directory` (written to a temp dir, then renamed)"""
+    dtype = np.dtype(spec['dtype'])
+    with metrics.timer('csv_load'):
+        data = features.load_data(data_path)
+    ohe = features.make_encoder(data)
+    columns = features.feature_names(ohe) + spec['lag_features']
+    rows = len(data) - rolling_features.HISTORY if spec['lag_features'] else len(data)
+
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.build-', dir=os.path.dirname(directory))
+    try:
+        X = np.lib.format.open_memmap(os.path.join(tmp_dir, 'X.npy'), mode='w+',
+                                      dtype=dtype, shape=(rows, len(columns)))
+        with metrics.timer('encode'):
+            encoded = features.encode(data, ohe, dtype=dtype)
+            y = data[features.TARGET].to_numpy()
+            if spec['lag_features']:
+                encoded, y = rolling_features.lagged_design(encoded, y)
+            X[:] = encoded
+        X.flush()
+        del X
+        np.save(os.path.join(tmp_dir, 'y.npy'), np.ascontiguousarray(y, dtype=dtype))
+        joblib.dump(ohe, os.path.join(tmp_dir, 'encoder.joblib'))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'columns': columns, 'rows': rows, 'spec': spec,
+                       'source': os.path.abspath(data_path)}, f, ensure_ascii=False, indent=2)
+        try:
+            os.replace(tmp_dir, directory)
+        except OSError:
+            # Another process finished the same build first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_feature_set(data_path=features.DATA_PATH, store_dir=STORE_DIR, dtype='float32',
+                     mmap_mode='r', rebuild=False, lag_features=False):
+    """FeatureSet for `data_path`, building the cache entry on first use"""
+    spec = feature_spec(dtype, lag_features)
+    key = store_key(data_path, spec)
+    directory = os.path.join(store_dir, key)
+
+    if rebuild and os.path.isdir(directory):
+        shutil.rmtree(directory)
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        with metrics.timer('feature_store_build'):
+            build(data_path, directory, spec)
+
+    with metrics.timer('feature_store_load'):
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        X = np.load(os.path.join(directory, 'X.npy'), mmap_mode=mmap_mode)
+        y = np.load(os.path.join(directory, 'y.npy'), mmap_mode=mmap_mode)
+        ohe = joblib.load(os.path.join(directory, 'encoder.joblib'))
+    return FeatureSet(X, y, meta['columns'], ohe, key, directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the encoded feature cache")
+    parser.add_argument('data_path', nargs='?', default=features.DATA_PATH)
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--lag-features', action='store_true', help="append rolling demand features")
+    args = parser.parse_args()
+
+    feature_set = load_feature_set(args.data_path, rebuild=args.rebuild, lag_features=args.lag_features)
+    print(f"{feature_set.key}: X {feature_set.X.shape} {feature_set.X.dtype}, "
+          f"C-contiguous={feature_set.X.flags['C_CONTIGUOUS']} -> {feature_set.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(ROOT_DIR, 'SeoulBikeData.csv')
+
+TARGET = 'Rented Bike Count'
+NUMERICAL_FEATURES = ['Hour', 'Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)',
+                      'Visibility (10m)', 'Dew point temperature(C)',
+                      'Solar Radiation (MJ/m2)', 'Rainfall(mm)', 'Snowfall (cm)']
+CATEGORICAL_FEATURES = ['Seasons', 'Holiday', 'Functioning Day']
+# Fixed (sorted) categories so every chunk / process encodes to the same columns
+CATEGORIES = [['Autumn', 'Spring', 'Summer', 'Winter'],
+              ['Holiday', 'No Holiday'],
+              ['No', 'Yes']]
+
+
+def load_data(path=DATA_PATH):
+    """Read the Seoul bike CSV with the same cleaning every entry point uses"""
+    data = pd.read_csv(path)
+    data = data.dropna().reset_index(drop=True)
+    data[TARGET] = data[TARGET].astype(float)
+    return data
+
+
+def make_encoder(data=None):
+    """OneHotEncoder (drop='first') over the fixed category lists"""
+    ohe = OneHotEncoder(sparse=False, drop='first', categories=CATEGORIES)
+    if data is None:
+        data = pd.DataFrame([[values[0] for values in CATEGORIES]], columns=CATEGORICAL_FEATURES)
+    ohe.fit(data[CATEGORICAL_FEATURES])
+    return ohe
+
+
+def feature_names(ohe):
+    return NUMERICAL_FEATURES + list(ohe.get_feature_names_out(CATEGORICAL_FEATURES))
+
+
+def encode(frame, ohe, dtype=np.float64):
+    """Design matrix: numerical columns followed by the one-hot columns"""
+    numeric = frame[NUMERICAL_FEATURES].to_numpy(dtype=dtype)
+    categorical = ohe.transform(frame[CATEGORICAL_FEATURES]).astype(dtype, copy=False)
+    return np.hstack([numeric, categorical])
+
+
+def lookup_tables(ohe):
+    """Per categorical column: {category: row} index and (categories, encoded width) table.
+
+    Encoding a column is then a table row lookup, equivalent to ohe.transform
+    for that column's block of output columns.
+    """
+    tables = []
+    for i, values in enumerate(ohe.categories_):
+        table = np.eye(len(values))
+        drop = None if ohe.drop_idx_ is None else ohe.drop_idx_[i]
+        if drop is not None:
+            table = np.delete(table, drop, axis=1)
+        tables.append(({str(c): j for j, c in enumerate(values)}, np.ascontiguousarray(table)))
+    return tables
+
+
+def input_frame(records):
+    """DataFrame from one input dict or a list of them (UI / API inputs)"""
+    if isinstance(records, dict):
+        records = [records]
+    return pd.DataFrame(records, columns=NUMERICAL_FEATURES + CATEGORICAL_FEATURES)
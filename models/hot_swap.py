@@ -0,0 +1,134 @@
+"""Pick up new model artifacts in a running process without restarting it.
+
+Writers publish with publish_artifact() (write to a temp file, then an
+atomic rename). A ModelWatcher polls the directory on a background thread,
+loads and validates the newest artifact, and swaps its active reference in
+one assignment. Readers take `watcher.current()` once per request, so an
+in-flight prediction keeps using the model it started with and never waits
+on a reload.
+"""
+import collections
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+from models import features
+from models.engines import load_engine
+from models.predictor import Predictor
+from utils import metrics
+
+ARTIFACT_PATTERN = '*.joblib'
+
+ActiveModel = collections.namedtuple('ActiveModel', ['version', 'predictor', 'path', 'loaded_at'])
+
+# Inputs every artifact must score to finite values before it goes live
+PROBE_INPUTS = [
+    {'Hour': 8, 'Temperature(C)': 20.0, 'Humidity(%)': 50, 'Wind speed (m/s)': 1.5,
+     'Visibility (10m)': 2000, 'Dew point temperature(C)': 9.0, 'Solar Radiation (MJ/m2)': 1.0,
+     'Rainfall(mm)': 0, 'Snowfall (cm)': 0, 'Seasons': 'Spring', 'Holiday': 'No Holiday',
+     'Functioning Day': 'Yes'},
+    {'Hour': 23, 'Temperature(C)': -8.0, 'Humidity(%)': 85, 'Wind speed (m/s)': 4.0,
+     'Visibility (10m)': 300, 'Dew point temperature(C)': -10.0, 'Solar Radiation (MJ/m2)': 0.0,
+     'Rainfall(mm)': 2.5, 'Snowfall (cm)': 1.0, 'Seasons': 'Winter', 'Holiday': 'Holiday',
+     'Functioning Day': 'No'},
+]
+
+
+def publish_artifact(engine, ohe, directory, version=None):
+    """Atomically write `engine` into `directory` as <version>.joblib"""
+    os.makedirs(directory, exist_ok=True)
+    version = version or time.strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(directory, f"{version}.joblib")
+    tmp_path = os.path.join(directory, f".{version}.joblib.tmp")
+    engine.save(tmp_path, ohe=ohe, version=version)
+    os.replace(tmp_path, path)
+    return path
+
+
+def validate(model, ohe):
+    """Raise ValueError unless the artifact scores the probe inputs sensibly"""
+    if ohe is None:
+        raise ValueError("artifact has no encoder")
+    X = features.encode(features.input_frame(PROBE_INPUTS), ohe)
+    predictions = np.asarray(model.predict(X))
+    if predictions.shape != (len(PROBE_INPUTS),) or not np.all(np.isfinite(predictions)):
+        raise ValueError(f"probe predictions invalid: {predictions!r}")
+
+
+class ModelWatcher:
+    def __init__(self, directory, interval=5.0, pattern=ARTIFACT_PATTERN, initial=None):
+        """`initial` is an optional Predictor served until an artifact is loaded"""
+        self.directory = directory
+        self.interval = interval
+        self.pattern = pattern
+        self.last_error = None
+        self._seen = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._active = None
+        if initial is not None:
+            self._active = ActiveModel('initial', initial, None, time.time())
+
+    def current(self):
+        """The active model; a single attribute read, never blocks"""
+        return self._active
+
+    def predict_batch(self, records):
+        return self._active.predictor.predict_batch(records)
+
+    def _newest(self):
+        paths = glob.glob(os.path.join(self.directory, self.pattern))
+        if not paths:
+            return None
+        path = max(paths, key=os.path.getmtime)
+        stat = os.stat(path)
+        return path, (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self):
+        """Load the newest artifact if it changed; returns True when a swap happened"""
+        newest = self._newest()
+        if newest is None or newest == self._seen:
+            return False
+        path, _ = newest
+        self._seen = newest
+
+        start = time.perf_counter()
+        try:
+            engine = load_engine(path)
+            ohe = engine.metadata.get('ohe')
+            validate(engine, ohe)
+        except Exception as e:
+            self.last_error = f"{os.path.basename(path)}: {e}"
+            metrics.set_gauge('model_reload_failed', self.last_error)
+            return False
+
+        version = engine.metadata.get('version') or os.path.splitext(os.path.basename(path))[0]
+        self._active = ActiveModel(version, Predictor(engine, ohe, version), path, time.time())
+        self.last_error = None
+        metrics.observe('model_reload', time.perf_counter() - start)
+        metrics.set_gauge('model_version', version)
+        metrics.clear_gauge('model_reload_failed')
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                self.last_error = str(e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
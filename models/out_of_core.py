@@ -0,0 +1,171 @@
+"""Train on a directory of CSV / Parquet files without loading it all into memory.
+
+    python -m models.out_of_core data/history --engine streaming_linear --chunksize 50000
+    python -m models.out_of_core data/history --engine sgd --epochs 3 --save model.joblib
+
+Peak memory is bounded by `chunksize` rows (times the prefetch depth when
+chunks are read on a background thread).
+"""
+import argparse
+import glob
+import os
+import queue
+import resource
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from models import features
+from models.engines import create_engine
+from utils import metrics
+
+SOURCE_PATTERNS = ('*.csv', '*.parquet')
+COLUMNS = features.NUMERICAL_FEATURES + features.CATEGORICAL_FEATURES + [features.TARGET]
+
+
+def list_sources(source):
+    """A single file, or every CSV / Parquet file in a directory (sorted)"""
+    if os.path.isdir(source):
+        paths = []
+        for pattern in SOURCE_PATTERNS:
+            paths.extend(glob.glob(os.path.join(source, '**', pattern), recursive=True))
+        return sorted(paths)
+    return [source]
+
+
+def read_chunks(path, chunksize):
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading .parquet sources requires pyarrow") from None
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=COLUMNS):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=COLUMNS, chunksize=chunksize)
+
+
+def encoded_chunks(paths, ohe, chunksize):
+    """(X, y) per chunk with the shared cleaning and encoding"""
+    for path in paths:
+        for frame in read_chunks(path, chunksize):
+            frame = frame.dropna()
+            if frame.empty:
+                continue
+            with metrics.timer('encode'):
+                X = features.encode(frame, ohe)
+                y = frame[features.TARGET].to_numpy(dtype=np.float64)
+            yield X, y
+
+
+def prefetch(iterator, depth=2, poll_interval=0.1):
+    """Run `iterator` on a background thread, keeping at most `depth` items ready.
+
+    If the consumer stops early (break, or an exception in the loop body) the
+    producer is told to stop and the thread is joined when the generator closes.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    errors = []
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=poll_interval)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(done)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+        # Free a producer blocked on a full queue
+        while True:
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                break
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def train_out_of_core(source, engine='streaming_linear', chunksize=50_000, epochs=1,
+                      background=True, prefetch_depth=2, **engine_params):
+    """Fit a partial_fit-capable engine over every chunk; returns (engine, ohe, stats)"""
+    model = create_engine(engine, **engine_params)
+    estimator = model.estimator
+    if not hasattr(estimator, 'partial_fit'):
+        raise ValueError(f"Engine '{model.name}' does not support partial_fit")
+
+    paths = list_sources(source)
+    if not paths:
+        raise FileNotFoundError(f"No CSV or Parquet files under {source}")
+    ohe = features.make_encoder()
+
+    def chunks():
+        iterator = encoded_chunks(paths, ohe, chunksize)
+        return prefetch(iterator, prefetch_depth) if background else iterator
+
+    stats = {'files': len(paths), 'chunks': 0, 'rows': 0}
+    start = time.perf_counter()
+    if hasattr(estimator, 'partial_fit_scaler'):
+        # First pass: feature statistics only
+        for X, _ in chunks():
+            estimator.partial_fit_scaler(X)
+    for _ in range(epochs):
+        for X, y in chunks():
+            with metrics.timer('fit'):
+                estimator.partial_fit(X, y)
+            stats['chunks'] += 1
+            stats['rows'] += len(y)
+    model.training_time = time.perf_counter() - start
+
+    stats['training_time'] = model.training_time
+    stats['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    model.metadata['out_of_core'] = stats
+    return model, ohe, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core training over many CSV/Parquet files")
+    parser.add_argument('source', help="directory (searched recursively) or single file")
+    parser.add_argument('--engine', default='streaming_linear', choices=['streaming_linear', 'sgd'])
+    parser.add_argument('--chunksize', type=int, default=50_000)
+    parser.add_argument('--epochs', type=int, default=1)
+    parser.add_argument('--no-background', action='store_true', help="read chunks on the training thread")
+    parser.add_argument('--save', default=None, help="artifact path")
+    args = parser.parse_args()
+
+    model, ohe, stats = train_out_of_core(args.source, args.engine, args.chunksize, args.epochs,
+                                          background=not args.no_background)
+    print(f"{stats['rows']} rows in {stats['chunks']} chunks from {stats['files']} files, "
+          f"{stats['training_time']:.2f}s, peak RSS {stats['peak_rss_mb']:.0f} MB")
+    if args.save:
+        model.save(args.save, ohe=ohe)
+        print(f"Saved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
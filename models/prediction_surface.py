@@ -0,0 +1,254 @@
+"""Precomputed prediction grid for instant what-if queries.
+
+Scores Hour x Season x Holiday x Functioning Day x temperature x humidity
+in one vectorized pass (for fixed wind, visibility, dew point, solar
+radiation, rainfall and snowfall) and answers later queries by bilinear
+interpolation over temperature and humidity. estimate_error() compares
+lookups with exact scoring at random off-grid points.
+
+    python -m models.prediction_surface --engine random_forest --out surface.npz
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+
+import numpy as np
+
+from models import features
+from utils import metrics
+
+FIXED_FEATURES = [name for name in features.NUMERICAL_FEATURES
+                  if name not in ('Hour', 'Temperature(C)', 'Humidity(%)')]
+HOUR_COL = features.NUMERICAL_FEATURES.index('Hour')
+TEMP_COL = features.NUMERICAL_FEATURES.index('Temperature(C)')
+HUMIDITY_COL = features.NUMERICAL_FEATURES.index('Humidity(%)')
+
+DEFAULT_TEMPERATURES = np.linspace(-20.0, 40.0, 61)  # 1 °C steps
+DEFAULT_HUMIDITIES = np.linspace(0.0, 100.0, 21)     # 5 % steps
+
+
+class PredictionSurface:
+    def __init__(self, grid, temperatures, humidities, fixed, error=None):
+        self.grid = grid  # float32 (24, seasons, holidays, functioning, temps, humidities)
+        self.temperatures = temperatures
+        self.humidities = humidities
+        self.fixed = fixed
+        self.error = error
+        self._t0, self._dt = float(temperatures[0]), float(temperatures[1] - temperatures[0])
+        self._h0, self._dh = float(humidities[0]), float(humidities[1] - humidities[0])
+        self._codes = [{value: i for i, value in enumerate(values)} for values in features.CATEGORIES]
+
+    @classmethod
+    def build(cls, predictor, inputs, temperatures=DEFAULT_TEMPERATURES,
+              humidities=DEFAULT_HUMIDITIES, chunk_rows=1 << 18):
+        """Score the full grid; `inputs` supplies the FIXED_FEATURES values"""
+        fixed = {name: float(inputs[name]) for name in FIXED_FEATURES}
+        combos = list(itertools.product(*features.CATEGORIES))
+        # One encoded row per categorical combination; numerics are filled in below
+        base = predictor.encode([dict(fixed, **{'Hour': 0.0, 'Temperature(C)': 0.0, 'Humidity(%)': 0.0},
+                                      **dict(zip(features.CATEGORICAL_FEATURES, combo)))
+                                 for combo in combos])
+        index_shape = (24, len(combos), len(temperatures), len(humidities))
+        total = int(np.prod(index_shape))
+        flat = np.empty(total, dtype=np.float32)
+        for start in range(0, total, chunk_rows):
+            stop = min(start + chunk_rows, total)
+            hour, combo, t, h = np.unravel_index(np.arange(start, stop), index_shape)
+            X = base[combo]
+            X[:, HOUR_COL] = hour
+            X[:, TEMP_COL] = temperatures[t]
+            X[:, HUMIDITY_COL] = humidities[h]
+            flat[start:stop] = predictor.predict_batch(X)
+        shape = (24,) + tuple(len(values) for values in features.CATEGORIES) + index_shape[2:]
+        return cls(flat.reshape(shape), np.asarray(temperatures, dtype=np.float64),
+                   np.asarray(humidities, dtype=np.float64), fixed)
+
+    def covers(self, inputs, tol=1e-9):
+        """True when `inputs` can be answered from this grid"""
+        try:
+            hour = float(inputs['Hour'])
+            temperature = float(inputs['Temperature(C)'])
+            humidity = float(inputs['Humidity(%)'])
+            if any(abs(float(inputs[name]) - value) > tol for name, value in self.fixed.items()):
+                return False
+            if any(inputs[c] not in codes for c, codes in zip(features.CATEGORICAL_FEATURES, self._codes)):
+                return False
+        except (KeyError, TypeError, ValueError):
+            return False
+        return (hour.is_integer() and 0 <= hour <= 23
+                and self.temperatures[0] <= temperature <= self.temperatures[-1]
+                and self.humidities[0] <= humidity <= self.humidities[-1])
+
+    def lookup(self, inputs):
+        """Interpolated prediction for one input dict (call covers() first)"""
+        plane = self.grid[int(inputs['Hour'])][tuple(
+            codes[inputs[c]] for c, codes in zip(features.CATEGORICAL_FEATURES, self._codes))]
+        ti, ft = self._cell((float(inputs['Temperature(C)']) - self._t0) / self._dt, len(self.temperatures))
+        hi, fh = self._cell((float(inputs['Humidity(%)']) - self._h0) / self._dh, len(self.humidities))
+        return float((1 - ft) * ((1 - fh) * plane[ti, hi] + fh * plane[ti, hi + 1])
+                     + ft * ((1 - fh) * plane[ti + 1, hi] + fh * plane[ti + 1, hi + 1]))
+
+    @staticmethod
+    def _cell(position, size):
+        index = min(int(position), size - 2)
+        return index, position - index
+
+    def lookup_batch(self, hours, categorical_codes, temperatures, humidities):
+        """Vectorized lookup; `categorical_codes` is one int array per categorical feature"""
+        t = (np.asarray(temperatures, dtype=np.float64) - self._t0) / self._dt
+        h = (np.asarray(humidities, dtype=np.float64) - self._h0) / self._dh
+        ti = np.minimum(t.astype(np.int64), len(self.temperatures) - 2)
+        hi = np.minimum(h.astype(np.int64), len(self.humidities) - 2)
+        ft, fh = t - ti, h - hi
+        planes = self.grid[(np.asarray(hours, dtype=np.int64),) + tuple(categorical_codes)]
+        rows = np.arange(len(ti))
+        return ((1 - ft) * ((1 - fh) * planes[rows, ti, hi] + fh * planes[rows, ti, hi + 1])
+                + ft * ((1 - fh) * planes[rows, ti + 1, hi] + fh * planes[rows, ti + 1, hi + 1]))
+
+    def estimate_error(self, predictor, n_samples=2000, seed=0):
+        """Empirical |lookup - exact| statistics at random off-grid points"""
+        rng = np.random.default_rng(seed)
+        hours = rng.integers(0, 24, n_samples)
+        codes = [rng.integers(0, len(values), n_samples) for values in features.CATEGORIES]
+        temperatures = rng.uniform(self.temperatures[0], self.temperatures[-1], n_samples)
+        humidities = rng.uniform(self.humidities[0], self.humidities[-1], n_samples)
+
+        records = [dict(self.fixed, **{'Hour': float(hours[i]), 'Temperature(C)': temperatures[i],
+                                       'Humidity(%)': humidities[i]},
+                        **{c: values[code[i]] for c, values, code
+                           in zip(features.CATEGORICAL_FEATURES, features.CATEGORIES, codes)})
+                   for i in range(n_samples)]
+        exact = predictor.predict_batch(records)
+        errors = np.abs(self.lookup_batch(hours, codes, temperatures, humidities) - exact)
+        self.error = {'samples': n_samples, 'max_abs': float(errors.max()),
+                      'p99_abs': float(np.percentile(errors, 99)), 'mean_abs': float(errors.mean())}
+        return self.error
+
+    def save(self, path):
+        np.savez_compressed(path, grid=self.grid, temperatures=self.temperatures,
+                            humidities=self.humidities,
+                            meta=np.array(json.dumps({'fixed': self.fixed, 'error': self.error})))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as archive:
+            meta = json.loads(str(archive['meta']))
+            return cls(archive['grid'], archive['temperatures'], archive['humidities'],
+                       meta['fixed'], meta['error'])
+
+
+def build_with_error(predictor, inputs):
+    with metrics.timer('surface_build'):
+        surface = PredictionSurface.build(predictor, inputs)
+        surface.estimate_error(predictor)
+    return surface
+
+
+class SurfaceCache:
+    """Surface for the current model and fixed inputs, built on a background thread.
+
+    One build runs at a time; a newer request supersedes a pending one and
+    the result of a superseded build is dropped. Queries off the grid of an
+    up-to-date surface return None without rebuilding (callers score exactly).
+    """
+
+    def __init__(self, builder=build_with_error):
+        self.builder = builder
+        self.surface = None  # (key, PredictionSurface)
+        self.last_error = None
+        self._pending = None  # newest requested (key, predictor, inputs)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(predictor, inputs):
+        return (predictor,) + tuple(float(inputs[name]) for name in FIXED_FEATURES)
+
+    def get(self, predictor, inputs):
+        """Surface covering `inputs`, or None (starting a build if none matches)"""
+        key = self.key(predictor, inputs)
+        ready = self.surface
+        if ready is not None and ready[0] == key:
+            return ready[1] if ready[1].covers(inputs) else None
+        with self._lock:
+            if self._pending is None or self._pending[0] != key:
+                self._pending = (key, predictor, dict(inputs))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='prediction-surface', daemon=True)
+                self._thread.start()
+        return None
+
+    def wait(self, timeout=None):
+        """Block until no build is running"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                request = self._pending
+                if request is None:
+                    self._thread = None
+                    return
+            key, predictor, inputs = request
+            try:
+                surface = self.builder(predictor, inputs)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Prediction surface build failed: {e}")
+                surface = None
+            with self._lock:
+                if self._pending is request:
+                    # Still the newest request; on failure the next get() asks again
+                    self._pending = None
+                    if surface is not None:
+                        self.surface = (key, surface)
+
+
+def main():
+    from models.predictor import Predictor
+    from models.training import train_model
+
+    parser = argparse.ArgumentParser(description="Precompute a prediction surface")
+    parser.add_argument('--engine', default=None)
+    parser.add_argument('--samples', type=int, default=2000, help="points for the error estimate")
+    parser.add_argument('--out', default=None, help=".npz output path")
+    args = parser.parse_args()
+
+    model, ohe = train_model(engine=args.engine)
+    predictor = Predictor(model, ohe)
+    # Median conditions of the training data for the fixed inputs
+    fixed = features.load_data()[FIXED_FEATURES].median().to_dict()
+
+    start = time.perf_counter()
+    surface = PredictionSurface.build(predictor, fixed)
+    build_seconds = time.perf_counter() - start
+    error = surface.estimate_error(predictor, args.samples)
+
+    query = dict(fixed, **{'Hour': 8, 'Temperature(C)': 17.3, 'Humidity(%)': 52.5,
+                           'Seasons': 'Spring', 'Holiday': 'No Holiday', 'Functioning Day': 'Yes'})
+    repeats = 10000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        surface.lookup(query)
+    lookup_us = (time.perf_counter() - start) / repeats * 1e6
+    start = time.perf_counter()
+    for _ in range(100):
+        predictor.predict_batch([query])
+    exact_us = (time.perf_counter() - start) / 100 * 1e6
+
+    print(f"grid {surface.grid.shape} = {surface.grid.size} points, {surface.grid.nbytes / 1e6:.1f} MB, "
+          f"built in {build_seconds:.2f}s")
+    print(f"lookup {lookup_us:.1f} us vs exact {exact_us:.1f} us per query")
+    print(f"error vs exact over {error['samples']} points: max {error['max_abs']:.2f}, "
+          f"p99 {error['p99_abs']:.2f}, mean {error['mean_abs']:.2f} bikes")
+    if args.out:
+        surface.save(args.out)
+        print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from models import features
+from models.engines import load_engine
+
+
+class Predictor:
+    """Immutable fitted pipeline (encoding + model), safe to share across threads.
+
+    Encoding uses read-only lookup tables built once at construction, and
+    nothing is mutated after __init__, so concurrent predict_* calls need
+    no locking.
+    """
+
+    __slots__ = ('_model', '_ohe', '_lookups', 'version')
+
+    def __init__(self, model, ohe, version=None):
+        lookups = []
+        for index, table in features.lookup_tables(ohe):
+            table.flags.writeable = False
+            lookups.append((index, table))
+        object.__setattr__(self, '_model', model)
+        object.__setattr__(self, '_ohe', ohe)
+        object.__setattr__(self, '_lookups', tuple(lookups))
+        object.__setattr__(self, 'version', version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Predictor is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Predictor is immutable")
+
+    def __reduce__(self):
+        return (Predictor, (self._model, self._ohe, self.version))
+
+    @classmethod
+    def from_artifact(cls, path):
+        engine = load_engine(path)
+        return cls(engine, engine.metadata['ohe'], engine.metadata.get('version'))
+
+    @property
+    def model(self):
+        return self._model
+
+    @property
+    def ohe(self):
+        return self._ohe
+
+    def encode(self, records):
+        """Design matrix for a DataFrame, a list of input dicts or one dict"""
+        frame = records if isinstance(records, pd.DataFrame) else features.input_frame(records)
+        blocks = [frame[features.NUMERICAL_FEATURES].to_numpy(dtype=np.float64)]
+        for column, (index, table) in zip(features.CATEGORICAL_FEATURES, self._lookups):
+            try:
+                codes = [index[str(value)] for value in frame[column]]
+            except KeyError as e:
+                raise ValueError(f"Unknown category {e} for {column}") from None
+            blocks.append(table[codes])
+        return np.hstack(blocks)
+
+    def predict_batch(self, records):
+        """Predictions for many inputs; an ndarray is taken as an encoded matrix"""
+        X = records if isinstance(records, np.ndarray) else self.encode(records)
+        return self._model.predict(X)
+
+    def predict_one(self, **inputs):
+        """Scalar prediction, e.g. predict_one(Hour=8, Seasons='Spring', ...)"""
+        return float(self.predict_batch([inputs])[0])
@@ -0,0 +1,143 @@
+"""Lag and rolling-window features of hourly demand, batch and online.
+
+Row t only sees counts up to hour t-1: lag_k is the count k hours earlier
+and rolling_*_w summarise the w hours before t (NaN until enough history).
+
+Counts are rounded to integers and window sums kept as exact int64, so the
+vectorized batch path and the O(1) ring-buffer path feed identical inputs to
+the shared _window_stats() and produce bit-identical features.
+
+Training opts in with train_model(lag_features=True), which builds its matrix
+with lagged_design(). Serving appends the live state with the same helper:
+
+    X = append_lags(predictor.encode(inputs), state.features())
+
+    python -m models.rolling_features      # test RMSE with and without lag features
+"""
+import numpy as np
+import pandas as pd
+
+from models import features
+
+LAGS = (1, 24, 168)
+WINDOWS = (24, 168)
+FEATURE_NAMES = ([f"lag_{lag}" for lag in LAGS]
+                 + [name for w in WINDOWS for name in (f"rolling_mean_{w}", f"rolling_std_{w}")])
+HISTORY = max(LAGS + WINDOWS)
+
+
+def _as_counts(values):
+    return np.rint(np.asarray(values, dtype=np.float64)).astype(np.int64)
+
+
+def _window_stats(total, total_sq, n):
+    """Mean and sample std from exact int64 window sums"""
+    total = np.asarray(total, dtype=np.int64)
+    total_sq = np.asarray(total_sq, dtype=np.int64)
+    mean = total / n
+    variance = (n * total_sq - total * total) / (n * (n - 1))
+    return mean, np.sqrt(np.maximum(variance, 0.0))
+
+
+def batch_features(counts):
+    """(rows, len(FEATURE_NAMES)) float64 matrix for a contiguous hourly series"""
+    y = _as_counts(counts)
+    n = len(y)
+    out = np.full((n, len(FEATURE_NAMES)), np.nan)
+
+    for j, lag in enumerate(LAGS):
+        if lag < n:
+            out[lag:, j] = y[:-lag]
+
+    cumsum = np.concatenate([[0], np.cumsum(y)])
+    cumsum_sq = np.concatenate([[0], np.cumsum(y * y)])
+    column = len(LAGS)
+    for w in WINDOWS:
+        if w < n:
+            t = np.arange(w, n)
+            mean, std = _window_stats(cumsum[t] - cumsum[t - w], cumsum_sq[t] - cumsum_sq[t - w], w)
+            out[w:, column] = mean
+            out[w:, column + 1] = std
+        column += 2
+    return out
+
+
+def add_lag_features(frame, column=features.TARGET):
+    """Copy of an hourly-sorted frame with the FEATURE_NAMES columns appended"""
+    result = frame.copy()
+    result[FEATURE_NAMES] = pd.DataFrame(batch_features(frame[column]), index=frame.index)
+    return result
+
+
+def append_lags(X, lags):
+    """Encoded design matrix with the lag columns appended (training and serving layout)"""
+    X = np.asarray(X)
+    return np.hstack([X, np.atleast_2d(lags).astype(X.dtype, copy=False)])
+
+
+def lagged_design(X, y):
+    """Training rows that have full history: lag columns appended, first HISTORY hours dropped"""
+    y = np.asarray(y)
+    lags = batch_features(y)
+    return append_lags(X[HISTORY:], lags[HISTORY:]), y[HISTORY:]
+
+
+class RollingDemandState:
+    """Online version of batch_features: update() once per hour, O(1) each"""
+
+    def __init__(self):
+        self._buffer = np.zeros(HISTORY, dtype=np.int64)
+        self._seen = 0
+        self._sums = {w: 0 for w in WINDOWS}
+        self._sums_sq = {w: 0 for w in WINDOWS}
+
+    @classmethod
+    def from_history(cls, counts):
+        """Warm up from past counts (only the last HISTORY hours are used)"""
+        state = cls()
+        counts = _as_counts(counts)
+        state._seen = max(0, len(counts) - HISTORY)
+        for value in counts[-HISTORY:]:
+            state.update(value)
+        return state
+
+    def update(self, count):
+        value = int(_as_counts(count))
+        for w in WINDOWS:
+            self._sums[w] += value
+            self._sums_sq[w] += value * value
+            if self._seen >= w:
+                # Must read the expiring value before its slot is overwritten
+                old = int(self._buffer[(self._seen - w) % HISTORY])
+                self._sums[w] -= old
+                self._sums_sq[w] -= old * old
+        self._buffer[self._seen % HISTORY] = value
+        self._seen += 1
+
+    def features(self):
+        """Feature vector for the next (not yet observed) hour"""
+        out = np.full(len(FEATURE_NAMES), np.nan)
+        for j, lag in enumerate(LAGS):
+            if self._seen >= lag:
+                out[j] = self._buffer[(self._seen - lag) % HISTORY]
+        column = len(LAGS)
+        for w in WINDOWS:
+            if self._seen >= w:
+                mean, std = _window_stats(self._sums[w], self._sums_sq[w], w)
+                out[column] = mean
+                out[column + 1] = std
+            column += 2
+        return out
+
+
+def main():
+    from models.training import train_model
+
+    for lag_features in (False, True):
+        model, _ = train_model(lag_features=lag_features)
+        label = 'with lag features' if lag_features else 'weather only'
+        print(f"{label:18s} test RMSE {model.metadata['test_rmse']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
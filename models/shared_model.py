@@ -0,0 +1,285 @@
+"""Serve one fitted model to many worker processes through shared memory.
+
+The parent flattens the model (linear coefficients, or every tree of a
+forest) and the one-hot lookup tables into a single read-only block, either
+a multiprocessing.shared_memory segment or an mmapped file. Workers attach
+to it and predict with numpy, so no worker holds its own copy.
+
+    python -m models.shared_model --workers 8 --engine random_forest --compare-pickle
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+from multiprocessing import shared_memory
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from models import features
+from models.training import train_model
+
+ALIGNMENT = 64
+
+
+def export_arrays(model, ohe):
+    """Flatten a fitted model (engine or bare estimator) + encoder into (arrays, meta)"""
+    model = getattr(model, 'estimator', model)
+    arrays = {}
+    meta = {'numerical_features': features.NUMERICAL_FEATURES,
+            'categorical_features': features.CATEGORICAL_FEATURES,
+            'categories': [[str(c) for c in values] for values in ohe.categories_]}
+
+    # One lookup table per categorical column: category index -> encoded block
+    for i, (_, table) in enumerate(features.lookup_tables(ohe)):
+        arrays[f"lookup_{i}"] = table
+
+    if hasattr(model, 'coef_'):
+        meta['kind'] = 'linear'
+        arrays['coef'] = np.ascontiguousarray(np.ravel(model.coef_), dtype=np.float64)
+        arrays['intercept'] = np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64))
+    elif hasattr(model, 'estimators_') and all(hasattr(t, 'tree_') for t in model.estimators_):
+        meta['kind'] = 'forest'
+        trees = [t.tree_ for t in model.estimators_]
+        sizes = np.array([t.node_count for t in trees])
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        left, right = [], []
+        for tree, start in zip(trees, starts):
+            # Shift child indices so they address the concatenated node arrays
+            left.append(np.where(tree.children_left == -1, -1, tree.children_left + start))
+            right.append(np.where(tree.children_right == -1, -1, tree.children_right + start))
+        arrays['roots'] = starts.astype(np.int64)
+        arrays['left'] = np.concatenate(left).astype(np.int64)
+        arrays['right'] = np.concatenate(right).astype(np.int64)
+        arrays['feature'] = np.concatenate([t.feature for t in trees]).astype(np.int64)
+        arrays['threshold'] = np.concatenate([t.threshold for t in trees]).astype(np.float64)
+        arrays['value'] = np.concatenate([t.value[:, 0, 0] for t in trees]).astype(np.float64)
+    else:
+        raise ValueError(f"{type(model).__name__} cannot be served from shared memory")
+    return arrays, meta
+
+
+def _layout(arrays):
+    entries = {}
+    offset = 0
+    for key, array in arrays.items():
+        offset = (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        entries[key] = {'offset': offset, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        offset += array.nbytes
+    return entries, max(offset, 1)
+
+
+class SharedModel:
+    """Parent-side owner of the shared block"""
+
+    def __init__(self, model, ohe, backend='shm', path=None):
+        arrays, meta = export_arrays(model, ohe)
+        entries, size = _layout(arrays)
+        self.backend = backend
+        self._shm = None
+
+        if backend == 'shm':
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            buffer = self._shm.buf
+            location = self._shm.name
+        elif backend == 'file':
+            if path is None:
+                fd, path = tempfile.mkstemp(suffix='.model.bin')
+                os.close(fd)
+            buffer = np.memmap(path, dtype=np.uint8, mode='w+', shape=(size,))
+            location = path
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+
+        for key, array in arrays.items():
+            entry = entries[key]
+            target = np.ndarray(array.shape, dtype=array.dtype, buffer=buffer, offset=entry['offset'])
+            target[...] = array
+        if backend == 'file':
+            buffer.flush()
+            del buffer
+
+        self.manifest = {'backend': backend, 'location': location, 'size': size,
+                         'arrays': entries, 'meta': meta}
+
+    def close(self):
+        """Release and remove the block (call once all workers are done)"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        elif self.backend == 'file' and os.path.exists(self.manifest['location']):
+            os.remove(self.manifest['location'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class AttachedModel:
+    """Worker-side read-only view of a SharedModel"""
+
+    def __init__(self, manifest):
+        if isinstance(manifest, str):
+            manifest = json.loads(manifest)
+        self.manifest = manifest
+        self.meta = manifest['meta']
+        self._shm = None
+
+        if manifest['backend'] == 'shm':
+            self._shm = _attach(manifest['location'])
+            buffer = self._shm.buf
+        else:
+            buffer = np.memmap(manifest['location'], dtype=np.uint8, mode='r', shape=(manifest['size'],))
+
+        self.arrays = {}
+        for key, entry in manifest['arrays'].items():
+            array = np.ndarray(tuple(entry['shape']), dtype=np.dtype(entry['dtype']),
+                               buffer=buffer, offset=entry['offset'])
+            array.flags.writeable = False
+            self.arrays[key] = array
+        self._category_index = [{c: i for i, c in enumerate(values)} for values in self.meta['categories']]
+
+    def encode(self, frame):
+        numeric = frame[self.meta['numerical_features']].to_numpy(dtype=np.float64)
+        blocks = [numeric]
+        for i, column in enumerate(self.meta['categorical_features']):
+            index = self._category_index[i]
+            try:
+                codes = np.fromiter((index[str(v)] for v in frame[column]), dtype=np.int64, count=len(frame))
+            except KeyError as e:
+                raise ValueError(f"Unknown category {e} for {column}") from None
+            blocks.append(self.arrays[f"lookup_{i}"][codes])
+        return np.hstack(blocks)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.meta['kind'] == 'linear':
+            return X @ self.arrays['coef'] + self.arrays['intercept'][0]
+        return self._predict_forest(X)
+
+    def predict_records(self, records):
+        return self.predict(self.encode(features.input_frame(records)))
+
+    def _predict_forest(self, X):
+        # sklearn compares float32 inputs against float64 thresholds
+        X = X.astype(np.float32)
+        left, right = self.arrays['left'], self.arrays['right']
+        feature, threshold = self.arrays['feature'], self.arrays['threshold']
+        rows = np.arange(len(X))
+        total = np.zeros(len(X))
+        for root in self.arrays['roots']:
+            node = np.full(len(X), root, dtype=np.int64)
+            active = rows[left[node] != -1]
+            while len(active):
+                current = node[active]
+                go_left = X[active, feature[current]] <= threshold[current]
+                node[active] = np.where(go_left, left[current], right[current])
+                active = active[left[node[active]] != -1]
+            total += self.arrays['value'][node]
+        return total / len(self.arrays['roots'])
+
+    def close(self):
+        self.arrays = {}
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
+
+
+def _attach(name):
+    # Only the creator should own the segment's lifetime. Python 3.13+ can attach
+    # without registering; before that the attach registers it again, which is
+    # harmless for multiprocessing children because they share the creator's
+    # resource tracker (unregistering there would drop the creator's entry).
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def memory_usage():
+    """Resident memory of this process in MB, split into private and shared parts"""
+    usage = {'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'RssAnon', 'RssFile', 'RssShmem'):
+                    usage[key] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return usage
+
+
+def _worker(mode, source, sample, results):
+    start = time.perf_counter()
+    if mode == 'shared':
+        model = AttachedModel(source)
+        predict = model.predict_records
+    else:
+        fitted, ohe = joblib.load(source)
+        predict = lambda records: fitted.predict(features.encode(features.input_frame(records), ohe))
+    ready = time.perf_counter() - start
+    predictions = predict(sample)
+    results.put({'pid': os.getpid(), 'mode': mode, 'start_seconds': ready,
+                 'first_prediction': float(predictions[0]), **memory_usage()})
+
+
+def run_workers(mode, source, sample, n_workers):
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(mode, source, sample, results)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return stats
+
+
+def _summarize(stats):
+    frame = pd.DataFrame(stats)
+    columns = [c for c in ('start_seconds', 'VmRSS', 'RssAnon', 'RssShmem', 'max_rss_mb') if c in frame]
+    return frame[columns].describe().loc[['mean', 'max']].round(3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-memory model serving demo")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--engine', choices=['linear', 'random_forest'], default='random_forest')
+    parser.add_argument('--backend', choices=['shm', 'file'], default='shm')
+    parser.add_argument('--compare-pickle', action='store_true',
+                        help="also start workers that each load their own joblib copy")
+    args = parser.parse_args()
+
+    model, ohe = train_model(engine=args.engine)
+    sample = features.load_data().head(256)[features.NUMERICAL_FEATURES + features.CATEGORICAL_FEATURES]
+    sample = sample.to_dict('records')
+
+    with SharedModel(model, ohe, backend=args.backend) as shared:
+        print(f"Shared block: {shared.manifest['size'] / 1e6:.2f} MB ({args.backend})")
+        stats = run_workers('shared', json.dumps(shared.manifest), sample, args.workers)
+        print("shared workers:")
+        print(_summarize(stats))
+
+    if args.compare_pickle:
+        fd, path = tempfile.mkstemp(suffix='.joblib')
+        os.close(fd)
+        try:
+            joblib.dump((model, ohe), path)
+            stats = run_workers('pickle', path, sample, args.workers)
+            print("pickle workers:")
+            print(_summarize(stats))
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
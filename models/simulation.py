@@ -0,0 +1,134 @@
+"""Monte Carlo weather-scenario simulation over the historical year.
+
+    python -m models.simulation --scenarios 2000 --out daily_bands.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from models import features
+from models.training import train_model
+from utils import metrics
+
+PERCENTILES = (5, 25, 50, 75, 95)
+# Default cap on rows scored per predict() call (~ 2M x 12 float64 = 190 MB)
+DEFAULT_CHUNK_ROWS = 2_000_000
+
+TEMP_COL = features.NUMERICAL_FEATURES.index('Temperature(C)')
+DEW_COL = features.NUMERICAL_FEATURES.index('Dew point temperature(C)')
+HUMIDITY_COL = features.NUMERICAL_FEATURES.index('Humidity(%)')
+RAIN_COL = features.NUMERICAL_FEATURES.index('Rainfall(mm)')
+
+
+def sample_scenarios(n_scenarios, seed=0, temp_sd=2.0, humidity_sd=5.0, rain_scale_sd=0.5):
+    """Per-scenario perturbations: temperature offset, humidity shift, rainfall multiplier"""
+    rng = np.random.default_rng(seed)
+    return {
+        'temp_shift': rng.normal(0.0, temp_sd, n_scenarios),
+        'humidity_shift': rng.normal(0.0, humidity_sd, n_scenarios),
+        'rain_scale': rng.lognormal(0.0, rain_scale_sd, n_scenarios),
+    }
+
+
+def _group_matrix(codes, n_groups, dtype):
+    """(rows, groups) 0/1 matrix so per-group sums become one matmul"""
+    matrix = np.zeros((len(codes), n_groups), dtype=dtype)
+    matrix[np.arange(len(codes)), codes] = 1
+    return matrix
+
+
+def simulate(model, ohe, data=None, n_scenarios=1000, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS,
+             rain_shock_prob=0.02, rain_shock_mm=5.0, percentiles=PERCENTILES, **scenario_kwargs):
+    """Score K perturbed copies of the year and return demand percentile bands.
+
+    Rows are scored in chunks of whole scenarios so at most `chunk_rows` rows
+    are materialised at once; `chunk_rows` must therefore be at least
+    len(data), otherwise ValueError is raised. Rainfall shocks add `rain_shock_mm` (exponential)
+    to a random `rain_shock_prob` fraction of hours. Temperature shifts move
+    the dew point by the same amount.
+
+    Returns a dict with 'daily' and 'seasonal' DataFrames (one column per
+    percentile) and an 'annual' Series of total-demand percentiles.
+    """
+    if data is None:
+        data = features.load_data()
+    base = features.encode(data, ohe)
+    n_rows, n_features = base.shape
+    if chunk_rows < n_rows:
+        raise ValueError(f"chunk_rows={chunk_rows} is smaller than one scenario ({n_rows} rows)")
+
+    scenarios = sample_scenarios(n_scenarios, seed, **scenario_kwargs)
+    rng = np.random.default_rng(seed + 1)
+
+    day_codes, days = pd.factorize(data['Date'])
+    season_codes, seasons = pd.factorize(data['Seasons'])
+    day_matrix = _group_matrix(day_codes, len(days), base.dtype)
+    season_matrix = _group_matrix(season_codes, len(seasons), base.dtype)
+
+    daily = np.empty((n_scenarios, len(days)))
+    seasonal = np.empty((n_scenarios, len(seasons)))
+
+    per_chunk = min(n_scenarios, chunk_rows // n_rows)
+    block = np.empty((per_chunk, n_rows, n_features), dtype=base.dtype)
+
+    for start in range(0, n_scenarios, per_chunk):
+        stop = min(start + per_chunk, n_scenarios)
+        m = stop - start
+        chunk = block[:m]
+        chunk[:] = base
+
+        temp_shift = scenarios['temp_shift'][start:stop, None]
+        chunk[:, :, TEMP_COL] += temp_shift
+        chunk[:, :, DEW_COL] += temp_shift
+        humidity = chunk[:, :, HUMIDITY_COL]
+        humidity += scenarios['humidity_shift'][start:stop, None]
+        np.clip(humidity, 0, 100, out=humidity)
+        rain = chunk[:, :, RAIN_COL]
+        rain *= scenarios['rain_scale'][start:stop, None]
+        shocks = rng.random((m, n_rows)) < rain_shock_prob
+        rain[shocks] += rng.exponential(rain_shock_mm, shocks.sum())
+
+        with metrics.timer('simulation_predict'):
+            predictions = model.predict(chunk.reshape(m * n_rows, n_features)).reshape(m, n_rows)
+        np.maximum(predictions, 0, out=predictions)
+
+        daily[start:stop] = predictions @ day_matrix
+        seasonal[start:stop] = predictions @ season_matrix
+
+    columns = [f"p{q}" for q in percentiles]
+    daily_bands = pd.DataFrame(np.percentile(daily, percentiles, axis=0).T,
+                               index=pd.Index(days, name='Date'), columns=columns)
+    seasonal_bands = pd.DataFrame(np.percentile(seasonal, percentiles, axis=0).T,
+                                  index=pd.Index(seasons, name='Seasons'), columns=columns)
+    annual = pd.Series(np.percentile(daily.sum(axis=1), percentiles), index=columns)
+    return {'daily': daily_bands, 'seasonal': seasonal_bands, 'annual': annual}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo demand simulation")
+    parser.add_argument('--scenarios', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--temp-sd', type=float, default=2.0)
+    parser.add_argument('--humidity-sd', type=float, default=5.0)
+    parser.add_argument('--rain-scale-sd', type=float, default=0.5)
+    parser.add_argument('--out', default=None, help="CSV path for the daily percentile bands")
+    args = parser.parse_args()
+
+    model, ohe = train_model()
+    result = simulate(model, ohe, n_scenarios=args.scenarios, seed=args.seed,
+                      chunk_rows=args.chunk_rows, temp_sd=args.temp_sd,
+                      humidity_sd=args.humidity_sd, rain_scale_sd=args.rain_scale_sd)
+
+    print("Seasonal demand percentiles:")
+    print(result['seasonal'].round(0))
+    print("\nAnnual demand percentiles:")
+    print(result['annual'].round(0))
+    if args.out:
+        result['daily'].to_csv(args.out)
+        print(f"\nDaily bands written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Score every O-A0003-001 station in one vectorized predict call."""
+import numpy as np
+import pandas as pd
+
+from models import features
+from utils import metrics
+from utils.weather_client import reading
+
+WEATHER_COLUMNS = {
+    'Temperature(C)': 'AirTemperature',
+    'Humidity(%)': 'RelativeHumidity',
+    'Wind speed (m/s)': 'WindSpeed',
+}
+
+
+class StationTable:
+    """Array-backed per-station weather and predictions (one entry per station)"""
+
+    def __init__(self, station_ids, names, counties, weather, predictions):
+        self.station_ids = station_ids
+        self.names = names
+        self.counties = counties
+        self.weather = weather          # {feature: float32 array}
+        self.predictions = predictions  # float32, NaN where readings are missing
+        self.valid = ~np.isnan(predictions)
+
+    def __len__(self):
+        return len(self.station_ids)
+
+    def group_summary(self, groups=None):
+        """Aggregate predictions per group; `groups` maps station id or name -> label.
+
+        Stations not covered by `groups` fall back to their county. Returns a
+        DataFrame indexed by group with station count, mean, min, max and total.
+        """
+        if groups:
+            labels = np.array([groups.get(sid, groups.get(name, county)) for sid, name, county
+                               in zip(self.station_ids, self.names, self.counties)], dtype=object)
+        else:
+            labels = self.counties
+        codes, names = pd.factorize(labels[self.valid])
+        values = self.predictions[self.valid].astype(np.float64)
+
+        count = np.bincount(codes, minlength=len(names))
+        total = np.bincount(codes, weights=values, minlength=len(names))
+        minimum = np.full(len(names), np.inf)
+        maximum = np.full(len(names), -np.inf)
+        np.minimum.at(minimum, codes, values)
+        np.maximum.at(maximum, codes, values)
+        return pd.DataFrame({'stations': count, 'mean': total / np.maximum(count, 1),
+                             'min': minimum, 'max': maximum, 'total': total},
+                            index=pd.Index(names, name='group')).sort_values('mean', ascending=False)
+
+    def to_frame(self):
+        frame = pd.DataFrame({'StationId': self.station_ids, 'StationName': self.names,
+                              'CountyName': self.counties})
+        for column, values in self.weather.items():
+            frame[column] = values
+        frame['prediction'] = self.predictions
+        return frame
+
+
+def predict_stations(stations, model, ohe, defaults):
+    """Predict demand at every station using its own temperature, humidity and wind.
+
+    `defaults` supplies the remaining inputs (Hour, Visibility, categoricals...)
+    shared by all stations. Stations with missing readings get NaN.
+    """
+    n = len(stations)
+    station_ids = np.array([s.get('StationId', '') for s in stations], dtype=object)
+    names = np.array([s.get('StationName', '') for s in stations], dtype=object)
+    counties = np.array([s['GeoInfo']['CountyName'] for s in stations], dtype=object)
+    weather = {}
+    for column, element in WEATHER_COLUMNS.items():
+        weather[column] = np.fromiter((reading(s['WeatherElement'].get(element)) for s in stations),
+                                      dtype=np.float32, count=n)
+
+    valid = np.ones(n, dtype=bool)
+    for values in weather.values():
+        valid &= ~np.isnan(values)
+    predictions = np.full(n, np.nan, dtype=np.float32)
+
+    if valid.any():
+        # Encode the shared inputs once, then overwrite the per-station columns
+        base = features.encode(features.input_frame(dict(defaults, **{c: 0.0 for c in WEATHER_COLUMNS})), ohe)
+        X = np.repeat(base, valid.sum(), axis=0)
+        for column, values in weather.items():
+            X[:, features.NUMERICAL_FEATURES.index(column)] = values[valid]
+        with metrics.timer('station_predict'):
+            predictions[valid] = np.maximum(model.predict(X), 0)
+
+    return StationTable(station_ids, names, counties, weather, predictions)
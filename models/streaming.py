@@ -0,0 +1,94 @@
+"""Estimators that can be trained one chunk at a time (see models/out_of_core.py)."""
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+
+class StreamingLinearRegression(BaseEstimator, RegressorMixin):
+    """Exact least squares from accumulated X'X and X'y.
+
+    Memory is O(features^2) regardless of the number of rows, and the result
+    equals LinearRegression on the concatenated data up to rounding. `alpha`
+    adds a tiny ridge term so constant chunks do not make the system singular.
+    """
+
+    def __init__(self, alpha=1e-8):
+        self.alpha = alpha
+
+    def _reset(self):
+        for attr in ('xtx_', 'xty_', 'n_samples_', 'coef_', 'intercept_'):
+            self.__dict__.pop(attr, None)
+
+    def partial_fit(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        augmented = np.hstack([X, np.ones((len(X), 1))])
+        if not hasattr(self, 'xtx_'):
+            self.xtx_ = np.zeros((augmented.shape[1], augmented.shape[1]))
+            self.xty_ = np.zeros(augmented.shape[1])
+            self.n_samples_ = 0
+        self.xtx_ += augmented.T @ augmented
+        self.xty_ += augmented.T @ y
+        self.n_samples_ += len(X)
+        self._solve()
+        return self
+
+    def _solve(self):
+        ridge = self.alpha * np.eye(len(self.xty_))
+        ridge[-1, -1] = 0.0  # never shrink the intercept
+        beta = np.linalg.lstsq(self.xtx_ + ridge, self.xty_, rcond=None)[0]
+        self.coef_ = beta[:-1]
+        self.intercept_ = beta[-1]
+
+    def fit(self, X, y):
+        self._reset()
+        return self.partial_fit(X, y)
+
+    def predict(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+
+class StandardizedSGDRegressor(BaseEstimator, RegressorMixin):
+    """SGDRegressor on standardized features, both fitted incrementally.
+
+    Call partial_fit_scaler over every chunk first (accumulated mean/variance),
+    then partial_fit for one or more epochs. If partial_fit is called before
+    any scaler statistics exist, the scaler is updated chunk by chunk instead.
+    """
+
+    def __init__(self, alpha=1e-4, eta0=0.01, learning_rate='invscaling', random_state=42):
+        self.alpha = alpha
+        self.eta0 = eta0
+        self.learning_rate = learning_rate
+        self.random_state = random_state
+
+    def _sgd(self, **kwargs):
+        return SGDRegressor(alpha=self.alpha, eta0=self.eta0, learning_rate=self.learning_rate,
+                            random_state=self.random_state, **kwargs)
+
+    def partial_fit_scaler(self, X):
+        if not hasattr(self, 'scaler_'):
+            self.scaler_ = StandardScaler()
+        self.scaler_.partial_fit(X)
+        self._scaler_frozen = True
+        return self
+
+    def partial_fit(self, X, y):
+        if not getattr(self, '_scaler_frozen', False):
+            if not hasattr(self, 'scaler_'):
+                self.scaler_ = StandardScaler()
+            self.scaler_.partial_fit(X)
+        if not hasattr(self, 'sgd_'):
+            self.sgd_ = self._sgd()
+        self.sgd_.partial_fit(self.scaler_.transform(X), y)
+        return self
+
+    def fit(self, X, y):
+        self.scaler_ = StandardScaler().fit(X)
+        self._scaler_frozen = True
+        self.sgd_ = self._sgd(max_iter=1000, tol=1e-4).fit(self.scaler_.transform(X), y)
+        return self
+
+    def predict(self, X):
+        return self.sgd_.predict(self.scaler_.transform(X))
@@ -0,0 +1,50 @@
+import numpy as np
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import train_test_split
+
+from models import features
+from models.engines import create_engine
+from models.feature_store import load_feature_set
+from models.rolling_features import FEATURE_NAMES, lagged_design
+from utils import metrics
+
+
+def train_model(data_path=features.DATA_PATH, engine=None, use_feature_store=True, lag_features=False,
+                **engine_params):
+    """Fit a model engine the same way main.py does; returns (engine, ohe)
+
+    `engine` is a registry name (default: BIKE_MODEL_ENGINE or 'linear').
+    With `use_feature_store` the encoded matrix is memory-mapped from the
+    feature store (built on first use) instead of re-encoding the CSV.
+    The held-out RMSE is stored in engine.metadata['test_rmse'].
+
+    `lag_features` appends the rolling demand features (see
+    models.rolling_features) and drops the first week, which lacks history;
+    callers must then predict with rolling_features.append_lags().
+    """
+    if use_feature_store:
+        feature_set = load_feature_set(data_path, lag_features=lag_features)
+        X, y, ohe = feature_set.X, feature_set.y, feature_set.ohe
+    else:
+        with metrics.timer('csv_load'):
+            data = features.load_data(data_path)
+
+        # One-hot encode categorical variables and prepare the design matrix
+        with metrics.timer('encode'):
+            ohe = features.make_encoder(data)
+            X = features.encode(data, ohe)
+            y = data[features.TARGET].to_numpy()
+            if lag_features:
+                X, y = lagged_design(X, y)
+
+    # Split and train
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = create_engine(engine, **engine_params)
+    with metrics.timer('fit'):
+        model.fit(X_train, y_train)
+
+    if lag_features:
+        model.metadata['lag_features'] = FEATURE_NAMES
+    model.metadata['test_rmse'] = float(np.sqrt(mean_squared_error(y_test, model.predict(X_test))))
+    model.measure_inference(X_test)
+    return model, ohe
@@ -0,0 +1,78 @@
+import os
+import time
+
+import joblib
+import pytest
+
+from models.hot_swap import ModelWatcher, publish_artifact
+from models.predictor import Predictor
+from models.training import train_model
+from utils import metrics
+
+
+@pytest.fixture(scope='module')
+def trained():
+    return train_model(engine='linear')
+
+
+@pytest.fixture
+def registry():
+    metrics.enable()
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+    metrics.disable()
+
+
+def _touch_newer(path):
+    # Make `path` the newest artifact even on filesystems with coarse mtimes
+    later = time.time() + 10
+    os.utime(path, (later, later))
+
+
+def test_publish_then_poll_swaps_version(tmp_path, trained):
+    model, ohe = trained
+    watcher = ModelWatcher(str(tmp_path), initial=Predictor(model, ohe))
+    assert watcher.current().version == 'initial'
+    assert not watcher.poll()
+
+    path = publish_artifact(model, ohe, str(tmp_path), version='v1')
+    assert os.path.basename(path) == 'v1.joblib'
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+    assert watcher.poll()
+    assert watcher.current().version == 'v1'
+    assert not watcher.poll()  # unchanged directory
+
+
+def test_invalid_artifact_keeps_previous_model(tmp_path, trained, registry):
+    model, ohe = trained
+    watcher = ModelWatcher(str(tmp_path))
+    publish_artifact(model, ohe, str(tmp_path), version='v1')
+    assert watcher.poll()
+
+    bad = os.path.join(str(tmp_path), 'v2.joblib')
+    joblib.dump({'not': 'an engine'}, bad)
+    _touch_newer(bad)
+    assert not watcher.poll()
+    assert watcher.current().version == 'v1'
+    assert 'v2.joblib' in watcher.last_error
+    assert 'model_reload_failed' in registry.gauges
+
+
+def test_good_reload_clears_failure(tmp_path, trained, registry):
+    model, ohe = trained
+    watcher = ModelWatcher(str(tmp_path))
+    bad = os.path.join(str(tmp_path), 'v1.joblib')
+    with open(bad, 'wb') as f:
+        f.write(b'garbage')
+    assert not watcher.poll()
+    assert watcher.current() is None
+    assert 'model_reload_failed' in registry.gauges
+
+    good = publish_artifact(model, ohe, str(tmp_path), version='v2')
+    _touch_newer(good)
+    assert watcher.poll()
+    assert watcher.current().version == 'v2'
+    assert watcher.last_error is None
+    assert 'model_reload_failed' not in registry.gauges
+    assert registry.gauges['model_version'].value == 'v2'
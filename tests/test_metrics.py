@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from utils import metrics
+
+
+@pytest.fixture
+def registry():
+    metrics.enable()
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+    metrics.disable()
+
+
+def test_prometheus_escapes_label_values(registry):
+    metrics.set_gauge('model_reload_failed', 'x: unexpected "EOF"\nline2')
+    text = registry.to_prometheus()
+    assert 'bike_model_reload_failed_info{value="x: unexpected \\"EOF\\"\\nline2"} 1\n' in text
+
+
+def test_export_while_metrics_are_registered(registry):
+    stop = threading.Event()
+
+    def register():
+        for i in range(20_000):
+            if stop.is_set():
+                break
+            metrics.observe(f"stage_{i}", 0.001)
+            metrics.set_gauge(f"gauge_{i}", i)
+
+    thread = threading.Thread(target=register)
+    thread.start()
+    try:
+        while thread.is_alive():
+            registry.to_dict()
+    finally:
+        stop.set()
+        thread.join()
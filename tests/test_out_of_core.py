@@ -0,0 +1,31 @@
+import threading
+
+import pytest
+
+from models.out_of_core import prefetch
+
+
+def test_prefetch_yields_everything_in_order():
+    assert list(prefetch(iter(range(50)), depth=2)) == list(range(50))
+
+
+def test_prefetch_propagates_producer_errors():
+    def failing():
+        yield 1
+        raise KeyError('broken chunk')
+
+    with pytest.raises(KeyError):
+        list(prefetch(failing()))
+
+
+def test_prefetch_stops_producer_when_consumer_fails():
+    before = threading.active_count()
+
+    def consume():
+        for item in prefetch(iter(range(10_000)), depth=2):
+            if item == 3:
+                raise RuntimeError("partial_fit failed")
+
+    with pytest.raises(RuntimeError):
+        consume()
+    assert threading.active_count() == before
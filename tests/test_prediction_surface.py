@@ -0,0 +1,80 @@
+import pytest
+
+from models.hot_swap import PROBE_INPUTS
+from models.prediction_surface import PredictionSurface, SurfaceCache, build_with_error
+from models.predictor import Predictor
+from models.training import train_model
+
+
+@pytest.fixture(scope='module')
+def predictor():
+    model, ohe = train_model(engine='linear')
+    return Predictor(model, ohe)
+
+
+@pytest.fixture
+def cache():
+    calls = []
+
+    def builder(predictor, inputs):
+        calls.append(dict(inputs))
+        return build_with_error(predictor, inputs)
+
+    cache = SurfaceCache(builder)
+    cache.calls = calls
+    return cache
+
+
+def ready(cache, predictor, inputs):
+    cache.get(predictor, inputs)
+    cache.wait(60)
+    return cache.get(predictor, inputs)
+
+
+def test_lookup_matches_exact_on_grid(predictor):
+    inputs = dict(PROBE_INPUTS[0], **{'Temperature(C)': 17.0, 'Humidity(%)': 55.0})
+    surface = PredictionSurface.build(predictor, inputs)
+    assert surface.covers(inputs)
+    assert surface.lookup(inputs) == pytest.approx(predictor.predict_one(**inputs), abs=0.01)
+    # Linear in temperature and humidity, so interpolation is exact off the grid too
+    assert surface.estimate_error(predictor, 200)['max_abs'] < 0.01
+
+
+def test_off_grid_query_does_not_rebuild(cache, predictor):
+    inputs = dict(PROBE_INPUTS[0])
+    assert ready(cache, predictor, inputs) is not None
+    assert len(cache.calls) == 1
+
+    for query in (dict(inputs, **{'Temperature(C)': 45.0}), dict(inputs, Seasons=''), dict(inputs, Hour=8.5)):
+        for _ in range(3):
+            assert cache.get(predictor, query) is None  # caller scores exactly
+        cache.wait(60)
+    assert len(cache.calls) == 1
+    assert cache.get(predictor, inputs) is not None
+
+
+def test_rebuild_on_new_fixed_inputs_or_model(cache, predictor):
+    inputs = dict(PROBE_INPUTS[0])
+    ready(cache, predictor, inputs)
+    windy = dict(inputs, **{'Wind speed (m/s)': 3.0})
+    assert ready(cache, predictor, windy) is not None
+    other = Predictor(predictor.model, predictor.ohe, version='v2')
+    assert ready(cache, other, windy) is not None
+    assert len(cache.calls) == 3
+
+
+def test_failed_build_is_retried(predictor):
+    attempts = []
+
+    def flaky(predictor, inputs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("out of memory")
+        return build_with_error(predictor, inputs)
+
+    cache = SurfaceCache(flaky)
+    inputs = dict(PROBE_INPUTS[0])
+    assert ready(cache, predictor, inputs) is None
+    assert cache.last_error == "out of memory"
+    assert ready(cache, predictor, inputs) is not None
+    assert len(attempts) == 2
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from models import features
+from models.feature_store import load_feature_set
+from models.rolling_features import (FEATURE_NAMES, HISTORY, RollingDemandState, append_lags,
+                                     batch_features, lagged_design)
+
+
+@pytest.fixture(scope='module')
+def data():
+    return features.load_data()
+
+
+@pytest.fixture(scope='module')
+def counts(data):
+    return data[features.TARGET].to_numpy()
+
+
+def test_batch_equals_online(counts):
+    batch = batch_features(counts)
+    state = RollingDemandState()
+    online = np.empty_like(batch)
+    for t, count in enumerate(counts):
+        online[t] = state.features()
+        state.update(count)
+    assert np.array_equal(batch, online, equal_nan=True)
+
+
+@pytest.mark.parametrize('t', [1, 24, 100, HISTORY, HISTORY + 1, 5000])
+def test_from_history_matches_batch(counts, t):
+    state = RollingDemandState.from_history(counts[:t])
+    assert np.array_equal(state.features(), batch_features(counts)[t], equal_nan=True)
+
+
+def test_from_history_then_updates(counts):
+    state = RollingDemandState.from_history(counts[:3000])
+    for count in counts[3000:3200]:
+        state.update(count)
+    assert np.array_equal(state.features(), batch_features(counts)[3200])
+
+
+def test_serving_row_matches_training_row(data, counts):
+    ohe = features.make_encoder(data)
+    X, y = lagged_design(features.encode(data, ohe), counts)
+    assert X.shape[1] == len(features.feature_names(ohe)) + len(FEATURE_NAMES)
+    assert not np.isnan(X).any()
+
+    t = 4000
+    state = RollingDemandState.from_history(counts[:t])
+    row = append_lags(features.encode(data.iloc[[t]], ohe), state.features())
+    assert np.array_equal(row[0], X[t - HISTORY])
+    assert y[t - HISTORY] == counts[t]
+
+
+def test_feature_store_lag_spec(tmp_path, counts):
+    plain = load_feature_set(store_dir=str(tmp_path))
+    lagged = load_feature_set(store_dir=str(tmp_path), lag_features=True)
+    assert lagged.key != plain.key
+    assert lagged.columns == plain.columns + FEATURE_NAMES
+    assert len(lagged) == len(plain) - HISTORY
+    np.testing.assert_array_equal(lagged.X[:, len(plain.columns):],
+                                  batch_features(counts)[HISTORY:].astype(np.float32))
@@ -0,0 +1,20 @@
+import glob
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def _segments():
+    return set(glob.glob('/dev/shm/psm_*'))
+
+
+def test_demo_exits_cleanly():
+    before = _segments()
+    result = subprocess.run([sys.executable, '-m', 'models.shared_model', '--workers', '2', '--engine', 'linear'],
+                            cwd=ROOT_DIR, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    assert 'Traceback' not in result.stderr
+    assert 'leaked' not in result.stderr
+    assert _segments() <= before
@@ -0,0 +1,76 @@
+import math
+import os
+
+import pytest
+import requests
+
+from utils.weather_client import WeatherClient, county_average, reading
+from utils.weather_fixtures import ReplayServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'weather')
+FIXTURE_STATIONS = 6
+
+
+def make_client(server, **kwargs):
+    return WeatherClient(api_key='replay', base_url=server.base_url,
+                         backoff_base=0.001, backoff_max=0.01, **kwargs)
+
+
+@pytest.fixture(scope='module')
+def predictor():
+    from models.predictor import Predictor
+    from models.training import train_model
+
+    model, ohe = train_model(engine='linear')
+    return Predictor(model, ohe)
+
+
+def test_fetch_county_average_predict(predictor):
+    with ReplayServer(FIXTURE_DIR) as server:
+        stations = make_client(server).observations()
+
+    # 大直 reports -99 (missing) temperature and humidity but a valid wind speed
+    temp, humidity, wind_speed = county_average(stations, '臺北市')
+    assert temp == pytest.approx((24.5 + 25.1 + 23.9) / 3)
+    assert humidity == pytest.approx((71 + 68 + 74) / 3)
+    assert wind_speed == pytest.approx((2.1 + 1.4 + 3.0 + 2.5) / 4)
+    assert county_average(stations, '花蓮縣') is None
+
+    prediction = predictor.predict_one(**{
+        'Hour': 13, 'Temperature(C)': temp, 'Humidity(%)': humidity, 'Wind speed (m/s)': wind_speed,
+        'Visibility (10m)': 2000, 'Dew point temperature(C)': 15.0, 'Solar Radiation (MJ/m2)': 1.5,
+        'Rainfall(mm)': 0, 'Snowfall (cm)': 0, 'Seasons': 'Spring', 'Holiday': 'No Holiday',
+        'Functioning Day': 'Yes'})
+    assert math.isfinite(prediction)
+
+
+def test_retries_injected_503():
+    with ReplayServer(FIXTURE_DIR, error_rate=0.5, seed=1) as server:
+        client = make_client(server, max_retries=20)
+        for _ in range(10):
+            assert len(client.observations()) == FIXTURE_STATIONS
+        assert server.request_count > 10
+
+
+def test_gives_up_after_max_retries():
+    with ReplayServer(FIXTURE_DIR, error_rate=1.0) as server:
+        client = make_client(server, max_retries=2)
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.observations()
+        assert server.request_count == 3
+
+
+@pytest.mark.parametrize('scale', [1, 4])
+def test_station_count_scales(scale):
+    with ReplayServer(FIXTURE_DIR, scale=scale) as server:
+        stations = make_client(server).observations()
+    assert len(stations) == FIXTURE_STATIONS * scale
+    assert len({s['StationId'] for s in stations}) == len(stations)
+
+
+def test_missing_readings_are_nan():
+    assert math.isnan(reading(-99))
+    assert math.isnan(reading('-999.0'))
+    assert math.isnan(reading(None))
+    assert math.isnan(reading('X'))
+    assert reading('-5.5') == -5.5
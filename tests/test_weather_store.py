@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pytest
+
+from utils.weather_fixtures import synthetic_observations
+from utils.weather_store import WeatherStore
+
+
+def snapshot(hour, n_stations=3):
+    stations = synthetic_observations(n_stations)['records']['Station']
+    for i, station in enumerate(stations):
+        station['ObsTime'] = {'DateTime': f"2024-05-01T{hour:02d}:00:00+08:00"}
+        station['WeatherElement']['AirTemperature'] = 100 + i
+    return stations
+
+
+def test_append_and_query(tmp_path):
+    store = WeatherStore(str(tmp_path))
+    assert store.append(snapshot(12)) == 3
+    assert store.append(snapshot(12)) == 0  # same ObsTime again
+    assert store.append(snapshot(13)) == 3
+
+    frame = store.query('2024-05-01T13:00', '2024-05-01T14:00', stations=['S00000'])
+    assert frame['temperature'].tolist() == [100]
+
+
+def test_interrupted_append_is_trimmed_by_next_append(tmp_path):
+    store = WeatherStore(str(tmp_path))
+    store.append(snapshot(12))
+    # Simulate a crash after only the key columns received one more row
+    partition = os.path.join(str(tmp_path), 'date=2024-05-01')
+    with open(os.path.join(partition, 'obs_time.i8'), 'ab') as f:
+        f.write(np.array([0], dtype='<i8').tobytes())
+    with open(os.path.join(partition, 'station.i4'), 'ab') as f:
+        f.write(np.array([1], dtype='<i4').tobytes())
+
+    store = WeatherStore(str(tmp_path))
+    store.append(snapshot(13))
+
+    frame = store.query('2024-05-01T13:00', '2024-05-01T14:00')
+    assert frame['station'].tolist() == ['S00000', 'S00001', 'S00002']
+    assert frame['temperature'].tolist() == [100, 101, 102]
+    # Every column holds 6 rows (the extension ends in the item size)
+    rows = {os.path.getsize(os.path.join(partition, name)) // int(name[-1]) for name in os.listdir(partition)}
+    assert rows == {6}
+
+
+def test_reader_opening_during_append(tmp_path, monkeypatch):
+    writer = WeatherStore(str(tmp_path))
+    writer.append(snapshot(12))
+    seen = {}
+    write_column = WeatherStore._write_column
+
+    def write_and_read(path, values):
+        write_column(path, values)
+        if path.endswith('temperature.f4'):
+            # Keys and temperature hold the 13:00 rows, the other fields do not yet
+            reader = WeatherStore(str(tmp_path))
+            seen['mid'] = reader.query()
+            seen['mid_temperature'] = reader.query(fields=['temperature'])
+
+    monkeypatch.setattr(WeatherStore, '_write_column', staticmethod(write_and_read))
+    assert writer.append(snapshot(13)) == 3
+    monkeypatch.undo()
+    assert len(seen['mid']) == 3
+    assert len(seen['mid_temperature']) == 6
+
+    writer.append(snapshot(14))
+    frame = WeatherStore(str(tmp_path)).query()
+    assert len(frame) == 9
+    assert frame['obs_time'].dt.hour.tolist() == [12] * 3 + [13] * 3 + [14] * 3
+    assert frame['temperature'].tolist() == [100, 101, 102] * 3
+
+
+def test_failed_append_is_rolled_back(tmp_path, monkeypatch):
+    store = WeatherStore(str(tmp_path))
+    store.append(snapshot(12))
+    write_column = WeatherStore._write_column
+
+    def fail_on_humidity(path, values):
+        if path.endswith('humidity.f4'):
+            raise OSError("disk full")
+        write_column(path, values)
+
+    monkeypatch.setattr(WeatherStore, '_write_column', staticmethod(fail_on_humidity))
+    with pytest.raises(OSError):
+        store.append(snapshot(13))
+    monkeypatch.undo()
+
+    assert store.append(snapshot(13)) == 3  # not skipped as already seen
+    frame = store.query()
+    assert frame['temperature'].tolist() == [100, 101, 102] * 2
+
+
+def test_added_field_keeps_history(tmp_path):
+    store = WeatherStore(str(tmp_path))
+    store.append(snapshot(12))
+    # Partition written before 'temperature' was one of the FIELDS
+    os.remove(os.path.join(str(tmp_path), 'date=2024-05-01', 'temperature.f4'))
+
+    reader = WeatherStore(str(tmp_path))
+    frame = reader.query()
+    assert frame['station'].tolist() == ['S00000', 'S00001', 'S00002']
+    assert frame['temperature'].isna().all()
+
+    reader.append(snapshot(13))
+    frame = WeatherStore(str(tmp_path)).query()
+    assert len(frame) == 6
+    assert frame['temperature'].iloc[:3].isna().all()
+    assert frame['temperature'].iloc[3:].tolist() == [100, 101, 102]
@@ -0,0 +1,279 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from functools import wraps
+
+# Upper bounds (seconds) of the latency buckets, Prometheus style
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = os.environ.get('BIKE_METRICS', '') not in ('', '0')
+_profiler = None
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (thread safe)"""
+
+    def __init__(self, name, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+            self.count = 0
+            self.sum = 0.0
+            self.min = None
+            self.max = None
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+                running += count
+                cumulative.append((bound, running))
+            return {
+                'count': self.count,
+                'sum': self.sum,
+                'min': self.min,
+                'max': self.max,
+                'mean': self.sum / self.count if self.count else None,
+                'buckets': cumulative,
+            }
+
+
+class Gauge:
+    """Last-value metric, e.g. the active model version"""
+
+    def __init__(self, name):
+        self.name = name
+        self.value = None
+        self.updated_at = None
+
+    def set(self, value):
+        self.value = value
+        self.updated_at = time.time()
+
+    def snapshot(self):
+        return {'value': self.value, 'updated_at': self.updated_at}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.gauges = {}
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self.histograms.setdefault(name, Histogram(name))
+        return hist
+
+    def gauge(self, name):
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            with self._lock:
+                gauge = self.gauges.setdefault(name, Gauge(name))
+        return gauge
+
+    def remove_gauge(self, name):
+        with self._lock:
+            self.gauges.pop(name, None)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.gauges.clear()
+
+    def _items(self):
+        # Copy under the lock: other threads register new metrics lazily
+        with self._lock:
+            return sorted(self.histograms.items()), sorted(self.gauges.items())
+
+    def to_dict(self):
+        result = {'histograms': {}, 'gauges': {}}
+        histograms, gauges = self._items()
+        for name, hist in histograms:
+            snap = hist.snapshot()
+            snap['buckets'] = [['+Inf' if b == float('inf') else b, c] for b, c in snap['buckets']]
+            result['histograms'][name] = snap
+        for name, gauge in gauges:
+            result['gauges'][name] = gauge.snapshot()
+        return result
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self, prefix='bike'):
+        lines = []
+        histograms, gauges = self._items()
+        for name, hist in histograms:
+            metric = f"{prefix}_{_sanitize(name)}_seconds"
+            snap = hist.snapshot()
+            lines.append(f"# TYPE {metric} histogram")
+            for bound, count in snap['buckets']:
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{metric}_bucket{{le="{le}"}} {count}')
+            lines.append(f"{metric}_sum {snap['sum']}")
+            lines.append(f"{metric}_count {snap['count']}")
+        for name, gauge in gauges:
+            value = gauge.value
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                # Non-numeric values (e.g. version strings) are exported as labels
+                metric = f"{prefix}_{_sanitize(name)}_info"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f'{metric}{{value="{_escape_label(value)}"}} 1')
+            else:
+                metric = f"{prefix}_{_sanitize(name)}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _sanitize(name):
+    return ''.join(c if c.isalnum() else '_' for c in name).lower()
+
+
+def _escape_label(value):
+    # Label values in the text exposition format escape backslash, quote and newline
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+class _NullTimer:
+    """Shared no-op timer returned when instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('name', 'start', 'elapsed')
+
+    def __init__(self, name):
+        self.name = name
+        self.elapsed = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        registry.histogram(self.name).observe(self.elapsed)
+        return False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def timer(name):
+    """Context manager recording the block duration into histogram `name`"""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def timed(name):
+    """Decorator version of timer()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe(name, seconds):
+    if _enabled:
+        registry.histogram(name).observe(seconds)
+
+
+def set_gauge(name, value):
+    if _enabled:
+        registry.gauge(name).set(value)
+
+
+def clear_gauge(name):
+    """Drop gauge `name` from the exports, e.g. once an error condition is resolved"""
+    registry.remove_gauge(name)
+
+
+def export(path):
+    """Write all metrics to `path`; .prom/.txt gives Prometheus text, otherwise JSON"""
+    if path.endswith(('.prom', '.txt')):
+        content = registry.to_prometheus()
+    else:
+        content = registry.to_json()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def start_profiling():
+    """Start a process-wide cProfile capture (no-op if one is running)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    return _profiler
+
+
+def stop_profiling(path=None, sort='cumulative', limit=40):
+    """Stop the capture, optionally dump raw stats to `path`, return a text summary"""
+    global _profiler
+    if _profiler is None:
+        return ''
+    _profiler.disable()
+    if path:
+        _profiler.dump_stats(path)
+    stream = io.StringIO()
+    pstats.Stats(_profiler, stream=stream).sort_stats(sort).print_stats(limit)
+    _profiler = None
+    return stream.getvalue()
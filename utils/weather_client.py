@@ -0,0 +1,146 @@
+import json
+import math
+import os
+import random
+import threading
+import time
+
+import requests
+
+from utils import metrics
+
+DEFAULT_BASE_URL = 'https://opendata.cwa.gov.tw/api/v1/rest/datastore'
+OBSERVATION_DATASET = 'O-A0003-001'  # 即時觀測 (all stations)
+FORECAST_DATASET = 'F-D0047-091'     # 鄉鎮天氣預報
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.json')
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MISSING_BELOW = -90  # CWA reports missing readings as -99 / -999
+
+
+def reading(value):
+    """Float value of a CWA reading; NaN when absent, malformed or flagged missing"""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return math.nan
+    return math.nan if value < MISSING_BELOW else value
+
+
+def load_config(path=CONFIG_PATH):
+    """Read the optional JSON config file at the repository root"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_api_key(path=CONFIG_PATH):
+    """API key lookup order: CWA_API_KEY env var, then config.json "cwa_api_key" """
+    key = os.environ.get('CWA_API_KEY') or load_config(path).get('cwa_api_key')
+    if not key:
+        raise RuntimeError("No CWA API key configured: set CWA_API_KEY or \"cwa_api_key\" in "
+                           f"{path}")
+    return key
+
+
+def load_base_url(path=CONFIG_PATH):
+    return os.environ.get('CWA_BASE_URL') or load_config(path).get('cwa_base_url') or DEFAULT_BASE_URL
+
+
+class WeatherClient:
+    """CWA open data client sharing one keep-alive session across fetches"""
+
+    def __init__(self, api_key=None, base_url=None, timeout=10, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0, pool_size=4, session=None):
+        self.api_key = api_key or load_api_key()
+        self.base_url = (base_url or load_base_url()).rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = session or self._create_session(pool_size)
+
+    @staticmethod
+    def _create_session(pool_size):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _backoff(self, attempt):
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def fetch(self, dataset, **params):
+        """GET one dataset and return the decoded JSON, retrying transient failures"""
+        url = f"{self.base_url}/{dataset}"
+        # Sent as a header so the key never shows up in URLs or HTTPError messages
+        headers = {'Authorization': self.api_key}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                with metrics.timer('weather_http'):
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt))
+                    continue
+                response.raise_for_status()
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+
+        with metrics.timer('weather_json_parse'):
+            return response.json()
+
+    def observations(self):
+        """O-A0003-001: list of current station observations"""
+        return self.fetch(OBSERVATION_DATASET)['records']['Station']
+
+    def forecast(self, location_name):
+        """F-D0047-091: forecast records for one county"""
+        return self.fetch(FORECAST_DATASET, LocationName=location_name)['records']
+
+    def close(self):
+        self.session.close()
+
+
+def county_average(stations, county):
+    """Mean (temperature, humidity, wind speed) over one county's stations.
+
+    Each element is averaged over the stations that report it; returns None
+    when the county has no valid reading for one of them.
+    """
+    elements = ('AirTemperature', 'RelativeHumidity', 'WindSpeed')
+    totals = [0.0] * len(elements)
+    counts = [0] * len(elements)
+
+    for station in stations:
+        if station['GeoInfo']['CountyName'] == county:
+            for i, element in enumerate(elements):
+                value = reading(station['WeatherElement'].get(element))
+                if not math.isnan(value):
+                    totals[i] += value
+                    counts[i] += 1
+
+    if not all(counts):
+        return None
+    return tuple(total / count for total, count in zip(totals, counts))
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide shared client, created on first use"""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = WeatherClient()
+    return _default_client
@@ -0,0 +1,229 @@
+"""Record real CWA responses and replay them from a local stand-in server.
+
+    python -m utils.weather_fixtures record
+    python -m utils.weather_fixtures serve --port 8765 --latency 0.2 --error-rate 0.05 --scale 10
+
+Point the app at the stand-in with CWA_BASE_URL=http://127.0.0.1:8765/api/v1/rest/datastore
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from utils.weather_client import FORECAST_DATASET, OBSERVATION_DATASET, WeatherClient, reading
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'weather')
+API_PREFIX = '/api/v1/rest/datastore/'
+
+
+def fixture_path(dataset, fixture_dir=FIXTURE_DIR):
+    return os.path.join(fixture_dir, f"{dataset}.json")
+
+
+def record(client=None, fixture_dir=FIXTURE_DIR, location='彰化縣'):
+    """Fetch both datasets from the live API and save the raw JSON payloads"""
+    client = client or WeatherClient()
+    os.makedirs(fixture_dir, exist_ok=True)
+    payloads = {
+        OBSERVATION_DATASET: client.fetch(OBSERVATION_DATASET),
+        FORECAST_DATASET: client.fetch(FORECAST_DATASET, LocationName=location),
+    }
+    paths = []
+    for dataset, payload in payloads.items():
+        path = fixture_path(dataset, fixture_dir)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def synthetic_observations(n_stations=50, seed=0):
+    """O-A0003-001 shaped payload used when nothing has been recorded yet"""
+    rng = random.Random(seed)
+    counties = ['彰化縣', '臺中市', '南投縣', '雲林縣', '臺北市', '高雄市']
+    stations = []
+    for i in range(n_stations):
+        stations.append({
+            'StationName': f"SYN{i:04d}",
+            'StationId': f"S{i:05d}",
+            'ObsTime': {'DateTime': '2024-01-01T12:00:00+08:00'},
+            'GeoInfo': {
+                'CountyName': counties[i % len(counties)],
+                'TownName': '',
+                'Coordinates': [{'CoordinateName': 'WGS84',
+                                 'StationLatitude': round(23.5 + rng.uniform(-1, 1), 4),
+                                 'StationLongitude': round(120.6 + rng.uniform(-0.5, 0.5), 4)}],
+            },
+            'WeatherElement': {
+                'AirTemperature': round(rng.uniform(10, 32), 1),
+                'RelativeHumidity': round(rng.uniform(40, 95)),
+                'WindSpeed': round(rng.uniform(0, 8), 1),
+            },
+        })
+    return {'success': 'true', 'records': {'Station': stations}}
+
+
+def load_fixture(dataset, fixture_dir=FIXTURE_DIR):
+    path = fixture_path(dataset, fixture_dir)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    if dataset == OBSERVATION_DATASET:
+        return synthetic_observations()
+    raise FileNotFoundError(f"No recorded fixture for {dataset} at {path}")
+
+
+def scale_observations(payload, factor, seed=0):
+    """Synthesize `factor` times the stations by cloning with small perturbations"""
+    if factor <= 1:
+        return payload
+    rng = random.Random(seed)
+    payload = copy.deepcopy(payload)
+    original = payload['records']['Station']
+    stations = list(original)
+    for copy_index in range(1, int(factor)):
+        for station in original:
+            clone = copy.deepcopy(station)
+            clone['StationId'] = f"{station.get('StationId', 'S')}-{copy_index}"
+            clone['StationName'] = f"{station.get('StationName', '')}#{copy_index}"
+            element = clone['WeatherElement']
+            for key, spread in (('AirTemperature', 1.5), ('RelativeHumidity', 5.0), ('WindSpeed', 0.5)):
+                value = reading(element.get(key))
+                if math.isnan(value):
+                    continue
+                value += rng.uniform(-spread, spread)
+                if key != 'AirTemperature':
+                    value = max(0.0, value)
+                element[key] = round(value, 1)
+            stations.append(clone)
+    payload['records']['Station'] = stations
+    return payload
+
+
+class ReplayServer:
+    """Local stand-in for opendata.cwa.gov.tw serving recorded payloads"""
+
+    def __init__(self, fixture_dir=FIXTURE_DIR, host='127.0.0.1', port=0,
+                 latency=0.0, jitter=0.0, error_rate=0.0, scale=1, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.request_count = 0
+
+        # Serialize once so the server measures transport, not json.dumps
+        self.payloads = {}
+        for dataset in (OBSERVATION_DATASET, FORECAST_DATASET):
+            try:
+                payload = load_fixture(dataset, fixture_dir)
+            except FileNotFoundError:
+                continue
+            if dataset == OBSERVATION_DATASET:
+                payload = scale_observations(payload, scale, seed)
+            self.payloads[dataset] = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX.rstrip('/')}"
+
+    def _draw(self):
+        with self._rng_lock:
+            self.request_count += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self._rng.random() < self.error_rate
+        return delay, failed
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real endpoint
+
+            def do_GET(self):
+                delay, failed = server._draw()
+                if delay:
+                    time.sleep(delay)
+                path = urlparse(self.path).path
+                dataset = path[len(API_PREFIX):] if path.startswith(API_PREFIX) else None
+                body = server.payloads.get(dataset)
+                if failed:
+                    self._send(503, b'{"success":"false"}')
+                elif body is None:
+                    self._send(404, b'{"success":"false"}')
+                else:
+                    self._send(200, body)
+
+            def _send(self, status, body):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record / replay CWA weather fixtures")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record')
+    rec.add_argument('--dir', default=FIXTURE_DIR)
+    rec.add_argument('--location', default='彰化縣')
+
+    serve = sub.add_parser('serve')
+    serve.add_argument('--dir', default=FIXTURE_DIR)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    serve.add_argument('--jitter', type=float, default=0.0, help="extra uniform random delay (seconds)")
+    serve.add_argument('--error-rate', type=float, default=0.0, help="fraction of 503 responses")
+    serve.add_argument('--scale', type=int, default=1, help="multiply the number of stations")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        for path in record(fixture_dir=args.dir, location=args.location):
+            print(f"Saved {path}")
+    else:
+        server = ReplayServer(args.dir, args.host, args.port, args.latency, args.jitter,
+                              args.error_rate, args.scale)
+        print(f"Serving {sorted(server.payloads)} at {server.base_url}")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Append-only, date-partitioned columnar history of O-A0003-001 observations.
+
+    python -m utils.weather_store collect --interval 600
+    python -m utils.weather_store query --station C0G640 --start 2024-05-01 --end 2024-05-08
+
+Layout (one raw little-endian array file per column, appended per snapshot):
+
+    data/weather_history/
+        stations.json               station id -> index, name, county, town, lat, lon
+        date=2024-05-01/
+            obs_time.i8             observation time, epoch seconds
+            station.i4              index into stations.json
+            temperature.f4 ...      one file per field in FIELDS (NaN = missing)
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from utils.weather_client import get_client, reading
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'weather_history')
+TAIWAN_TZ = timezone(timedelta(hours=8))
+
+# column -> path inside WeatherElement
+FIELDS = {
+    'temperature': ('AirTemperature',),
+    'humidity': ('RelativeHumidity',),
+    'wind_speed': ('WindSpeed',),
+    'wind_direction': ('WindDirection',),
+    'pressure': ('AirPressure',),
+    'precipitation': ('Now', 'Precipitation'),
+}
+KEY_COLUMNS = {'obs_time': np.dtype('<i8'), 'station': np.dtype('<i4')}
+FIELD_DTYPE = np.dtype('<f4')
+
+
+def _column_dtypes():
+    return dict(KEY_COLUMNS, **{name: FIELD_DTYPE for name in FIELDS})
+
+
+def _column_path(directory, name):
+    dtype = _column_dtypes()[name]
+    return os.path.join(directory, f"{name}.{dtype.kind}{dtype.itemsize}")
+
+
+def _partition_rows(directory):
+    """(rows held by every existing column file, names of the missing ones)"""
+    rows, missing = None, []
+    for name, dtype in _column_dtypes().items():
+        path = _column_path(directory, name)
+        if os.path.exists(path):
+            length = os.path.getsize(path) // dtype.itemsize
+            rows = length if rows is None else min(rows, length)
+        else:
+            missing.append(name)
+    return rows or 0, missing
+
+
+def _element(station, path):
+    value = station.get('WeatherElement', {})
+    for key in path:
+        if not isinstance(value, dict):
+            return np.nan
+        value = value.get(key)
+    return reading(value)
+
+
+def _partition_name(epoch_seconds):
+    return 'date=' + datetime.fromtimestamp(epoch_seconds, TAIWAN_TZ).strftime('%Y-%m-%d')
+
+
+class WeatherStore:
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._stations_path = os.path.join(directory, 'stations.json')
+        self.stations = []        # metadata dicts, position = station index
+        self._station_index = {}  # StationId -> index
+        if os.path.exists(self._stations_path):
+            with open(self._stations_path, encoding='utf-8') as f:
+                self.stations = json.load(f)
+            self._station_index = {s['id']: i for i, s in enumerate(self.stations)}
+        self._last_seen = self._load_last_seen()
+
+    # -- writing -----------------------------------------------------------
+
+    def _register(self, station):
+        station_id = station.get('StationId') or station.get('StationName')
+        index = self._station_index.get(station_id)
+        if index is None:
+            geo = station.get('GeoInfo', {})
+            coordinates = {c.get('CoordinateName'): c for c in geo.get('Coordinates', [])}
+            wgs84 = coordinates.get('WGS84', {})
+            index = len(self.stations)
+            self.stations.append({'id': station_id, 'name': station.get('StationName', ''),
+                                  'county': geo.get('CountyName', ''), 'town': geo.get('TownName', ''),
+                                  'lat': wgs84.get('StationLatitude'), 'lon': wgs84.get('StationLongitude')})
+            self._station_index[station_id] = index
+        return index
+
+    def _save_stations(self):
+        tmp_path = self._stations_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.stations, f, ensure_ascii=False)
+        os.replace(tmp_path, self._stations_path)
+
+    def append(self, stations):
+        """Append one O-A0003-001 snapshot; returns the number of new rows.
+
+        Observations already stored for a station (same ObsTime) are skipped,
+        so polling faster than the CWA update cadence adds nothing.
+        """
+        known = len(self.stations)
+        last_seen = dict(self._last_seen)
+        rows = {name: [] for name in _column_dtypes()}
+        for station in stations:
+            try:
+                obs_time = int(datetime.fromisoformat(station['ObsTime']['DateTime']).timestamp())
+            except (KeyError, TypeError, ValueError):
+                continue
+            index = self._register(station)
+            if last_seen.get(index, -1) >= obs_time:
+                continue
+            last_seen[index] = obs_time
+            rows['obs_time'].append(obs_time)
+            rows['station'].append(index)
+            for name, path in FIELDS.items():
+                rows[name].append(_element(station, path))
+
+        if len(self.stations) != known:
+            self._save_stations()
+        if not rows['obs_time']:
+            return 0
+
+        columns = {name: np.asarray(rows[name], dtype=dtype) for name, dtype in _column_dtypes().items()}
+        partitions = np.array([_partition_name(t) for t in columns['obs_time']])
+        for partition in np.unique(partitions):
+            mask = partitions == partition
+            directory = os.path.join(self.directory, partition)
+            os.makedirs(directory, exist_ok=True)
+            sizes = self._prepare_partition(directory)
+            try:
+                for name, values in columns.items():
+                    self._write_column(_column_path(directory, name), values[mask])
+            except BaseException:
+                # Roll back this append only, so the columns stay aligned
+                for name, size in sizes.items():
+                    with open(_column_path(directory, name), 'ab') as f:
+                        f.truncate(size)
+                raise
+            # Only rows that reached disk count as seen, so a failed append can be retried
+            for index, obs_time in zip(columns['station'][mask].tolist(), columns['obs_time'][mask].tolist()):
+                if obs_time > self._last_seen.get(index, -1):
+                    self._last_seen[index] = obs_time
+        return len(columns['obs_time'])
+
+    @staticmethod
+    def _write_column(path, values):
+        with open(path, 'ab') as f:
+            f.write(values.tobytes())
+
+    def _prepare_partition(self, directory):
+        """Align `directory`'s columns before appending; returns their sizes in bytes.
+
+        Only the writer calls this (one collector per store; readers never
+        modify files). Columns are appended one after another, so a collector
+        killed mid-append leaves some columns longer than others: those extra
+        rows were never completed and are cut back to the shared row count.
+        A column missing entirely was added to FIELDS after the partition was
+        written and is backfilled with NaN.
+        """
+        dtypes = _column_dtypes()
+        rows, missing = _partition_rows(directory)
+        if missing and len(missing) < len(dtypes) and any(name in KEY_COLUMNS for name in missing):
+            raise ValueError(f"{directory} is missing key column(s) {missing}")
+        for name in missing:
+            self._write_column(_column_path(directory, name), np.full(rows, np.nan, dtype=dtypes[name]))
+        sizes = {}
+        for name, dtype in dtypes.items():
+            path = _column_path(directory, name)
+            sizes[name] = rows * dtype.itemsize
+            if os.path.getsize(path) != sizes[name]:
+                with open(path, 'ab') as f:
+                    f.truncate(sizes[name])
+        return sizes
+
+    # -- reading -----------------------------------------------------------
+
+    def partitions(self):
+        return sorted(name for name in os.listdir(self.directory) if name.startswith('date='))
+
+    def _read_partition(self, partition, names=None):
+        directory = os.path.join(self.directory, partition)
+        dtypes = _column_dtypes()
+        names = names or list(dtypes)
+        arrays = {}
+        for name in names:
+            dtype = dtypes[name]
+            path = _column_path(directory, name)
+            if not os.path.exists(path):
+                continue  # field added after this partition was written
+            # Whole rows only: an append may be in progress
+            length = os.path.getsize(path) // dtype.itemsize
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', shape=(length,)) if length else np.empty(0, dtype)
+        # Columns are appended one at a time; clip to the rows all of them hold
+        rows = min((len(a) for a in arrays.values()), default=0)
+        for name in names:
+            if name not in arrays:
+                arrays[name] = np.full(rows, np.nan, dtype=dtypes[name]) if name in FIELDS else np.empty(0, dtypes[name])
+                rows = min(rows, len(arrays[name]))
+        return {name: arrays[name][:rows] for name in names}
+
+    def _load_last_seen(self):
+        last_seen = {}
+        for partition in self.partitions()[-2:]:
+            arrays = self._read_partition(partition, ['obs_time', 'station'])
+            for index, obs_time in zip(arrays['station'].tolist(), arrays['obs_time'].tolist()):
+                if obs_time > last_seen.get(index, -1):
+                    last_seen[index] = obs_time
+        return last_seen
+
+    def query(self, start=None, end=None, stations=None, fields=None):
+        """Observations with start <= time < end for the given station ids.
+
+        `start` / `end` are datetimes or ISO strings (naive = Taiwan time).
+        Returns a DataFrame with obs_time (tz-aware), station id and the fields.
+        """
+        start_ts = self._to_epoch(start)
+        end_ts = self._to_epoch(end)
+        first = _partition_name(start_ts) if start_ts is not None else None
+        last = _partition_name(end_ts) if end_ts is not None else None
+        wanted = None
+        if stations is not None:
+            wanted = np.array([self._station_index[s] for s in stations if s in self._station_index],
+                              dtype=np.int32)
+        names = ['obs_time', 'station'] + list(fields or FIELDS)
+
+        pieces = []
+        for partition in self.partitions():
+            if (first and partition < first) or (last and partition > last):
+                continue
+            arrays = self._read_partition(partition, names)
+            mask = np.ones(len(arrays['obs_time']), dtype=bool)
+            if start_ts is not None:
+                mask &= arrays['obs_time'] >= start_ts
+            if end_ts is not None:
+                mask &= arrays['obs_time'] < end_ts
+            if wanted is not None:
+                mask &= np.isin(arrays['station'], wanted)
+            pieces.append({name: np.asarray(a[mask]) for name, a in arrays.items()})
+
+        if pieces:
+            columns = {name: np.concatenate([p[name] for p in pieces]) for name in names}
+        else:
+            columns = {name: np.empty(0, dtype=_column_dtypes()[name]) for name in names}
+        ids = np.array([s['id'] for s in self.stations], dtype=object)
+        frame = pd.DataFrame({
+            'obs_time': pd.to_datetime(columns['obs_time'], unit='s', utc=True).tz_convert('Asia/Taipei'),
+            'station': ids[columns['station']] if len(ids) else np.empty(0, dtype=object),
+        })
+        for name in names[2:]:
+            frame[name] = columns[name]
+        return frame.sort_values(['obs_time', 'station'], kind='stable').reset_index(drop=True)
+
+    @staticmethod
+    def _to_epoch(value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=TAIWAN_TZ)
+        return int(value.timestamp())
+
+
+def collect(store=None, client=None, interval=600, iterations=None):
+    """Fetch and append a snapshot every `interval` seconds (forever by default)"""
+    store = store or WeatherStore()
+    client = client or get_client()
+    count = 0
+    while iterations is None or count < iterations:
+        started = time.monotonic()
+        try:
+            added = store.append(client.observations())
+            print(f"{datetime.now(TAIWAN_TZ):%Y-%m-%d %H:%M:%S} stored {added} observations")
+        except Exception as e:
+            print(f"Collect failed: {e}")
+        count += 1
+        if iterations is None or count < iterations:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weather observation history store")
+    parser.add_argument('--dir', default=STORE_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    col = sub.add_parser('collect')
+    col.add_argument('--interval', type=float, default=600, help="seconds between snapshots")
+    col.add_argument('--iterations', type=int, default=None)
+
+    qry = sub.add_parser('query')
+    qry.add_argument('--station', action='append', help="StationId (repeatable)")
+    qry.add_argument('--start')
+    qry.add_argument('--end')
+    qry.add_argument('--out', help="CSV output path")
+    args = parser.parse_args()
+
+    store = WeatherStore(args.dir)
+    if args.command == 'collect':
+        collect(store, interval=args.interval, iterations=args.iterations)
+    else:
+        frame = store.query(args.start, args.end, args.station)
+        if args.out:
+            frame.to_csv(args.out, index=False)
+            print(f"{len(frame)} rows written to {args.out}")
+        else:
+            print(frame)
+
+
+if __name__ == "__main__":
+    main()